@@ -1,34 +1,88 @@
 # model_backend.py
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 
+import model_kernels
+import model_sqlite
+from model_kmeans import ParallelKMeans
+
 def load_and_process_data(csv_file='BD.csv'):
+    """Carga los incidentes desde el CSV o, si la ruta es .db/.sqlite, desde la base de model_sqlite."""
+    if model_sqlite.is_sqlite_file(csv_file):
+        return model_sqlite.load_incidents(csv_file)
     df = pd.read_csv(csv_file, encoding='latin1').dropna()
     df['Latitud_round'] = df['Latitud'].round(1)
     df['Longitud_round'] = df['Longitud'].round(1)
     return df
 
-def get_regional_summary_by_year(df, year):
-    """Filtra los datos por un año específico y genera el resumen regional."""
+def get_historical_data(csv_file='BD.csv', df=None):
+    """Retorna los datos de 2015 a 2023, cargando el CSV solo si no se recibe un DataFrame."""
+    if df is None:
+        if model_sqlite.is_sqlite_file(csv_file):
+            # El filtro de años se resuelve en SQL con el índice por año
+            return model_sqlite.load_incidents(csv_file, years=(2015, 2023))
+        df = load_and_process_data(csv_file)
+    return df[(df['Año'] >= 2015) & (df['Año'] <= 2023)].copy()
+
+def get_year_data(df, year, csv_file='BD.csv'):
+    """
+    Retorna los incidentes de un año. Si df es None se leen de csv_file: con una base SQLite,
+    solo las filas de ese año (filtro en SQL con el índice por año).
+    """
+    if df is None:
+        if model_sqlite.is_sqlite_file(csv_file):
+            return model_sqlite.load_incidents(csv_file, year=year)
+        df = load_and_process_data(csv_file)
     data_year = df[df['Año'] == year]
     if data_year.empty:
         raise ValueError(f"No hay datos para el año {year}")
+    return data_year
+
+def summarize_regions(data):
+    """Agrupa los incidentes por celda de 0.1° con su frecuencia, duración promedio y vegetación predominante."""
+    # Mismo resultado que groupby(celda).agg(count, mean, moda), con los núcleos de model_kernels
+    cells, first = model_kernels.grid_cells(data['Latitud_round'], data['Longitud_round'])
+    n_cells = len(first)
+    return pd.DataFrame({
+        'Latitud_round': data['Latitud_round'].to_numpy()[first],
+        'Longitud_round': data['Longitud_round'].to_numpy()[first],
+        'frecuencia_incendios': model_kernels.group_counts(cells, n_cells),
+        'duracion_promedio': model_kernels.group_mean(cells, n_cells, data['Duración días']),
+        'vegetacion_predominante': model_kernels.group_mode(cells, n_cells, data['Tipo Vegetación'])
+    })
+
+def summarize_incendio_clusters(data):
+    """Perfil de cada clúster individual: número de incendios, duración media y valores más comunes."""
+    labels, inverse = np.unique(data['cluster_incendio'].to_numpy(), return_inverse=True)
+    inverse = inverse.ravel()
+    n_labels = len(labels)
+    return pd.DataFrame({
+        'cluster_incendio': labels,
+        'num_incendios': model_kernels.group_counts(inverse, n_labels),
+        'duracion_media': model_kernels.group_mean(inverse, n_labels, data['Duración días']),
+        'impacto_comun': model_kernels.group_mode(inverse, n_labels, data['Tipo impacto']),
+        'causa_comun': model_kernels.group_mode(inverse, n_labels, data['Causa']),
+        'vegetacion_comun': model_kernels.group_mode(inverse, n_labels, data['Tipo Vegetación'])
+    })
+
+def get_regional_summary_by_year(df, year, csv_file='BD.csv'):
+    """
+    Filtra los datos por un año específico y genera el resumen regional.
+    Con df None y una base SQLite, el resumen se agrega en SQL sin cargar los incidentes.
+    """
+    if df is None and model_sqlite.is_sqlite_file(csv_file):
+        return model_sqlite.regional_summary(csv_file, year=year)
+    data_year = get_year_data(df, year, csv_file)
     # Recalcular coordenadas redondeadas
     data_year['Latitud_round'] = data_year['Latitud'].round(1)
     data_year['Longitud_round'] = data_year['Longitud'].round(1)
     
-    region_summary = data_year.groupby(['Latitud_round', 'Longitud_round']).agg(
-        frecuencia_incendios=('Año', 'count'),
-        duracion_promedio=('Duración días', 'mean'),
-        vegetacion_predominante=('Tipo Vegetación', lambda x: x.mode()[0])
-    ).reset_index()
-    return region_summary
+    return summarize_regions(data_year)
 
-def compute_regional_clusters(region_summary):
+def compute_regional_clusters(region_summary, n_init=10):
     """Aplica KMeans a los datos regionales y añade la asignación de clúster."""
     veg_encoder = OneHotEncoder(sparse_output=False)
     veg_encoded = veg_encoder.fit_transform(region_summary[['vegetacion_predominante']])
@@ -41,17 +95,26 @@ def compute_regional_clusters(region_summary):
     scaler = StandardScaler()
     region_scaled = scaler.fit_transform(region_features)
 
-    kmeans_region = KMeans(n_clusters=5, random_state=42, n_init=10)
+    kmeans_region = ParallelKMeans(n_clusters=5, random_state=42, n_init=n_init)
     region_summary['cluster_region'] = kmeans_region.fit_predict(region_scaled)
     return region_summary
 
-def get_individual_summary_by_year(df, year):
-    """Filtra los datos por un año específico y genera el resumen de clústeres individuales."""
-    data_year = df[df['Año'] == year]
-    if data_year.empty:
-        raise ValueError(f"No hay datos para el año {year}")
-    data_year = data_year.copy()
+def cluster_regions(region_summary, data, engine='kmeans'):
+    """
+    Añade cluster_region al resumen por celda con el motor indicado:
+      - 'kmeans': compute_regional_clusters (5 clústeres sobre las celdas).
+      - 'hotspots': focos por densidad sobre los incidentes de data (model_hotspots),
+        con -1 para las celdas de ruido.
+    """
+    if engine == 'kmeans':
+        return compute_regional_clusters(region_summary)
+    if engine == 'hotspots':
+        from model_hotspots import assign_hotspot_regions
+        return assign_hotspot_regions(region_summary, data)
+    raise ValueError(f"Motor regional desconocido: {engine}")
 
+def build_individual_pipeline(n_clusters=4, n_init=10):
+    """Construye el pipeline (preprocesamiento + KMeans) del clúster de incendios individuales."""
     categorical_cols = ['Causa', 'Tipo impacto', 'Tipo Vegetación']
     numerical_cols = ['Duración días', 'Latitud', 'Longitud']
 
@@ -59,52 +122,84 @@ def get_individual_summary_by_year(df, year):
         ('num', StandardScaler(), numerical_cols),
         ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_cols)
     ])
-    pipeline = Pipeline([
+    return Pipeline([
         ('preprocessor', preprocessor),
-        ('kmeans', KMeans(n_clusters=4, random_state=42, n_init=10))
+        ('kmeans', ParallelKMeans(n_clusters=n_clusters, random_state=42, n_init=n_init))
     ])
-    data_year['cluster_incendio'] = pipeline.fit_predict(data_year)
 
-    incendio_profiles = data_year.groupby('cluster_incendio').agg(
-        num_incendios=('Año', 'count'),
-        duracion_media=('Duración días', 'mean'),
-        impacto_comun=('Tipo impacto', lambda x: x.mode()[0]),
-        causa_comun=('Causa', lambda x: x.mode()[0]),
-        vegetacion_comun=('Tipo Vegetación', lambda x: x.mode()[0])
+def fit_individual_clusters(data, weighted=False):
+    """
+    Ajusta el pipeline de clústeres individuales y retorna (pipeline, etiqueta de cada incidente).
+    Con weighted=True, los incidentes con la misma celda, causa, impacto, vegetación y duración
+    se agrupan en un patrón (con su latitud/longitud media) y KMeans se ajusta sobre los patrones
+    con su número de incidentes como sample_weight. El preprocesamiento se ajusta con todas las
+    filas, así que las escalas son las mismas que sin agrupar; el resultado es una aproximación
+    cuyo costo depende del número de patrones distintos y no del número de incidentes.
+    """
+    pipeline = build_individual_pipeline()
+    if not weighted:
+        return pipeline, pipeline.fit_predict(data)
+    
+    pattern_cols = ['Latitud_round', 'Longitud_round', 'Causa', 'Tipo impacto', 'Tipo Vegetación', 'Duración días']
+    groups = data.groupby(pattern_cols, sort=False, observed=True)
+    pattern_ids = groups.ngroup().to_numpy()
+    patterns = groups.agg(
+        Latitud=('Latitud', 'mean'),
+        Longitud=('Longitud', 'mean'),
+        peso=('Año', 'count')
     ).reset_index()
+    
+    preprocessor = pipeline.named_steps['preprocessor'].fit(data)
+    kmeans = pipeline.named_steps['kmeans']
+    kmeans.fit(preprocessor.transform(patterns), sample_weight=patterns['peso'].to_numpy())
+    return pipeline, kmeans.labels_[pattern_ids]
+
+def get_individual_summary_by_year(df, year, csv_file='BD.csv'):
+    """Filtra los datos por un año específico y genera el resumen de clústeres individuales."""
+    data_year = get_year_data(df, year, csv_file).copy()
+
+    pipeline = build_individual_pipeline()
+    data_year['cluster_incendio'] = pipeline.fit_predict(data_year)
+
+    incendio_profiles = summarize_incendio_clusters(data_year)
     return data_year, incendio_profiles
 
-def get_top10_regions_by_year(df, year):
+def get_top10_regions_by_year(df, year, csv_file='BD.csv'):
     """Retorna el top 10 de regiones (por frecuencia de incendios) para un año."""
-    reg_summary = get_regional_summary_by_year(df, year)
+    reg_summary = get_regional_summary_by_year(df, year, csv_file)
     reg_summary = compute_regional_clusters(reg_summary)
     top10 = reg_summary.sort_values(by='frecuencia_incendios', ascending=False).head(10)
     return top10
 
-def get_ecosystem_summary_by_year(df, year):
-    """Retorna el resumen de incendios por ecosistema para un año."""
-    data_year = df[df['Año'] == year]
-    if data_year.empty:
-        raise ValueError(f"No hay datos para el año {year}")
-    ecosistema_summary = data_year.groupby('Tipo Vegetación').agg(
+def get_ecosystem_summary_by_year(df, year, rollup=None, csv_file='BD.csv'):
+    """
+    Retorna el resumen de incendios por ecosistema para un año.
+    Si se recibe un model_rollup.SummaryRollup, se obtiene de la tabla agregada; con df None
+    y una base SQLite, se agrega en SQL.
+    """
+    if rollup is not None:
+        return rollup.ecosystem_summary(year)
+    if df is None and model_sqlite.is_sqlite_file(csv_file):
+        return model_sqlite.ecosystem_summary(csv_file, year=year)
+    data_year = get_year_data(df, year, csv_file)
+    ecosistema_summary = data_year.groupby('Tipo Vegetación', observed=True).agg(
         frecuencia_incendios=('Año', 'count'),
         duracion_promedio=('Duración días', 'mean')
     ).sort_values(by='frecuencia_incendios', ascending=False).reset_index()
     return ecosistema_summary
 
-def compute_risk_matrix_by_year(df, year):
+def compute_risk_matrix_by_year(df, year, regional_engine='kmeans', csv_file='BD.csv'):
     """
     Para un año, asigna a cada incidente el clúster regional (según sus coordenadas redondeadas)
     y cruza con el clúster individual para generar la matriz de riesgo.
+    regional_engine elige el motor del clúster regional (ver cluster_regions).
     """
-    # Filtrar el dataframe para el año indicado
-    data_year = df[df['Año'] == year].copy()
-    if data_year.empty:
-        raise ValueError(f"No hay datos para el año {year}")
+    # Filtrar el dataframe para el año indicado (con df None, leerlo de csv_file)
+    data_year = get_year_data(df, year, csv_file).copy()
     
     # Calcular el resumen regional usando el subconjunto filtrado
     reg_summary = get_regional_summary_by_year(data_year, year)
-    reg_summary = compute_regional_clusters(reg_summary)
+    reg_summary = cluster_regions(reg_summary, data_year, regional_engine)
     
     # Asignar a cada incidente su clúster regional mediante merge
     data_year = data_year.merge(reg_summary[['Latitud_round','Longitud_round','cluster_region']], 
@@ -114,61 +209,86 @@ def compute_risk_matrix_by_year(df, year):
     data_year_ind, _ = get_individual_summary_by_year(data_year, year)
     
     # Generar la matriz de riesgo cruzando ambos clústeres
-    risk_matrix = pd.crosstab(data_year['cluster_region'], data_year_ind['cluster_incendio'])
+    risk_matrix = model_kernels.crosstab(data_year['cluster_region'], data_year_ind['cluster_incendio'])
     return risk_matrix
 
-def get_top10_regions_historical(csv_file='BD.csv'):
-    """Retorna el top 10 de regiones usando datos históricos (2015-2023)."""
-    df = load_and_process_data(csv_file)
-    df_hist = df[(df['Año'] >= 2015) & (df['Año'] <= 2023)].copy()
-    reg_summary = df_hist.groupby(['Latitud_round', 'Longitud_round']).agg(
-        frecuencia_incendios=('Año', 'count'),
-        duracion_promedio=('Duración días', 'mean'),
-        vegetacion_predominante=('Tipo Vegetación', lambda x: x.mode()[0])
-    ).reset_index()
+def compute_year_results(df, year, rollup=None, regional_engine='kmeans', csv_file='BD.csv'):
+    """
+    Calcula en una sola pasada todos los resultados de un año (los mismos que las funciones
+    por año individuales), ajustando cada modelo una sola vez.
+    Retorna un diccionario con la misma estructura que historical_analysis.
+    Con df None, los incidentes del año se leen una sola vez de csv_file (con una base
+    SQLite, solo las filas de ese año) y los resúmenes se calculan sobre ellos.
+    """
+    if df is None:
+        df = get_year_data(None, year, csv_file)
+    reg_summary = get_regional_summary_by_year(df, year)
+    reg_summary = cluster_regions(reg_summary, df[df['Año'] == year], regional_engine)
+    top10 = reg_summary.sort_values(by='frecuencia_incendios', ascending=False).head(10)
+    ecosistema_summary = get_ecosystem_summary_by_year(df, year, rollup)
+    
+    # Individual, con el clúster regional de cada incidente para la matriz de riesgo
+    data_year, incendio_profiles = get_individual_summary_by_year(df, year)
+    data_year = data_year.merge(reg_summary[['Latitud_round','Longitud_round','cluster_region']], 
+                                on=['Latitud_round','Longitud_round'], how='left')
+    risk_matrix = model_kernels.crosstab(data_year['cluster_region'], data_year['cluster_incendio'])
+    
+    return {
+        'regional': reg_summary,
+        'individual': {'data': data_year, 'summary': incendio_profiles},
+        'top10_regiones': top10,
+        'ecosistema_summary': ecosistema_summary,
+        'risk_matrix': risk_matrix
+    }
+
+def get_top10_regions_historical(csv_file='BD.csv', df=None):
+    """
+    Retorna el top 10 de regiones usando datos históricos (2015-2023).
+    Con una base SQLite y sin df, el resumen por celda se agrega en SQL sin cargar los incidentes.
+    """
+    if df is None and model_sqlite.is_sqlite_file(csv_file):
+        reg_summary = model_sqlite.regional_summary(csv_file, years=(2015, 2023))
+    else:
+        reg_summary = summarize_regions(get_historical_data(csv_file, df))
     reg_summary = compute_regional_clusters(reg_summary)
     top10 = reg_summary.sort_values(by='frecuencia_incendios', ascending=False).head(10)
     return top10
 
-def get_ecosystem_summary_historical(csv_file='BD.csv'):
-    """Retorna el resumen de ecosistemas usando datos históricos (2015-2023)."""
-    df = load_and_process_data(csv_file)
-    df_hist = df[(df['Año'] >= 2015) & (df['Año'] <= 2023)].copy()
-    ecosistema_summary = df_hist.groupby('Tipo Vegetación').agg(
+def get_ecosystem_summary_historical(csv_file='BD.csv', df=None, rollup=None):
+    """
+    Retorna el resumen de ecosistemas usando datos históricos (2015-2023).
+    Con una base SQLite y sin df ni rollup, se agrega en SQL sin cargar los incidentes.
+    """
+    if rollup is not None:
+        return rollup.ecosystem_summary()
+    if df is None and model_sqlite.is_sqlite_file(csv_file):
+        return model_sqlite.ecosystem_summary(csv_file, years=(2015, 2023))
+    df_hist = get_historical_data(csv_file, df)
+    ecosistema_summary = df_hist.groupby('Tipo Vegetación', observed=True).agg(
         frecuencia_incendios=('Año', 'count'),
         duracion_promedio=('Duración días', 'mean')
     ).sort_values(by='frecuencia_incendios', ascending=False).reset_index()
     return ecosistema_summary
 
-def compute_risk_matrix_historical(csv_file='BD.csv'):
-    """Genera la matriz de riesgo usando todos los datos de 2015 a 2023."""
-    df = load_and_process_data(csv_file)
-    df_hist = df[(df['Año'] >= 2015) & (df['Año'] <= 2023)].copy()
+def compute_risk_matrix_historical(csv_file='BD.csv', df=None, weighted=False, regional_engine='kmeans'):
+    """
+    Genera la matriz de riesgo usando todos los datos de 2015 a 2023.
+    Con weighted=True el clúster individual se ajusta sobre patrones ponderados
+    (ver fit_individual_clusters); regional_engine elige el motor regional (ver cluster_regions).
+    """
+    df_hist = get_historical_data(csv_file, df)
     # Regional
-    reg_summary = df_hist.groupby(['Latitud_round', 'Longitud_round']).agg(
-        frecuencia_incendios=('Año', 'count'),
-        duracion_promedio=('Duración días', 'mean'),
-        vegetacion_predominante=('Tipo Vegetación', lambda x: x.mode()[0])
-    ).reset_index()
-    reg_summary = compute_regional_clusters(reg_summary)
+    reg_summary = summarize_regions(df_hist)
+    reg_summary = cluster_regions(reg_summary, df_hist, regional_engine)
     df_hist = df_hist.merge(reg_summary[['Latitud_round','Longitud_round','cluster_region']], 
                             on=['Latitud_round','Longitud_round'], how='left')
     # Individual: calcular clúster individual para los datos históricos
-    categorical_cols = ['Causa', 'Tipo impacto', 'Tipo Vegetación']
-    numerical_cols = ['Duración días', 'Latitud', 'Longitud']
-    preprocessor = ColumnTransformer(transformers=[
-        ('num', StandardScaler(), numerical_cols),
-        ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_cols)
-    ])
-    pipeline = Pipeline([
-        ('preprocessor', preprocessor),
-        ('kmeans', KMeans(n_clusters=4, random_state=42, n_init=10))
-    ])
-    df_hist['cluster_incendio'] = pipeline.fit_predict(df_hist)
-    risk_matrix = pd.crosstab(df_hist['cluster_region'], df_hist['cluster_incendio'])
+    _, df_hist['cluster_incendio'] = fit_individual_clusters(df_hist, weighted)
+    risk_matrix = model_kernels.crosstab(df_hist['cluster_region'], df_hist['cluster_incendio'])
     return risk_matrix
 
-def historical_analysis(csv_file='BD.csv'):
+def historical_analysis(csv_file='BD.csv', df=None, chunksize=None, weighted=False, rollup=None,
+                        regional_engine='kmeans'):
     """
     Realiza el análisis histórico utilizando la información acumulada de 2015 a 2023.
     Retorna:
@@ -177,49 +297,48 @@ def historical_analysis(csv_file='BD.csv'):
       - Top 10 regiones
       - Resumen de ecosistemas
       - Matriz de riesgo
+    Si se indica chunksize, el CSV (o la base SQLite) se procesa por bloques sin cargarlo
+    completo en memoria (ver model_outofcore.historical_analysis_chunked); no se combina con
+    df, weighted ni otro motor regional que 'kmeans'.
+    Con weighted=True el clúster individual se ajusta sobre incidentes agrupados en
+    patrones ponderados (ver fit_individual_clusters).
+    Con rollup (model_rollup.SummaryRollup), el resumen de ecosistemas sale de la tabla agregada.
+    regional_engine elige el motor del clúster regional (ver cluster_regions).
     """
-    df = load_and_process_data(csv_file)
-    df_hist = df[(df['Año'] >= 2015) & (df['Año'] <= 2023)].copy()
+    if chunksize is not None:
+        if regional_engine != 'kmeans':
+            raise ValueError(f"El análisis por bloques solo admite el motor regional 'kmeans', no '{regional_engine}'")
+        if weighted:
+            raise ValueError("El análisis por bloques no admite weighted=True")
+        if df is not None:
+            raise ValueError("chunksize lee el archivo por bloques; no se puede combinar con un DataFrame ya cargado")
+        from model_outofcore import historical_analysis_chunked
+        return historical_analysis_chunked(csv_file, chunksize=chunksize)
+    
+    df_hist = get_historical_data(csv_file, df)
     
     # Regional
-    reg_summary = df_hist.groupby(['Latitud_round', 'Longitud_round']).agg(
-        frecuencia_incendios=('Año', 'count'),
-        duracion_promedio=('Duración días', 'mean'),
-        vegetacion_predominante=('Tipo Vegetación', lambda x: x.mode()[0])
-    ).reset_index()
-    reg_summary = compute_regional_clusters(reg_summary)
+    reg_summary = summarize_regions(df_hist)
+    reg_summary = cluster_regions(reg_summary, df_hist, regional_engine)
     
     # Top 10 regiones
     top10 = reg_summary.sort_values(by='frecuencia_incendios', ascending=False).head(10)
     
     # Ecosistema
-    ecosistema_summary = df_hist.groupby('Tipo Vegetación').agg(
-        frecuencia_incendios=('Año', 'count'),
-        duracion_promedio=('Duración días', 'mean')
-    ).sort_values(by='frecuencia_incendios', ascending=False).reset_index()
+    if rollup is not None:
+        ecosistema_summary = rollup.ecosystem_summary()
+    else:
+        ecosistema_summary = df_hist.groupby('Tipo Vegetación', observed=True).agg(
+            frecuencia_incendios=('Año', 'count'),
+            duracion_promedio=('Duración días', 'mean')
+        ).sort_values(by='frecuencia_incendios', ascending=False).reset_index()
     
     # Individual: calcular clúster individual para los datos históricos
-    categorical_cols = ['Causa', 'Tipo impacto', 'Tipo Vegetación']
-    numerical_cols = ['Duración días', 'Latitud', 'Longitud']
-    preprocessor = ColumnTransformer(transformers=[
-        ('num', StandardScaler(), numerical_cols),
-        ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_cols)
-    ])
-    pipeline = Pipeline([
-        ('preprocessor', preprocessor),
-        ('kmeans', KMeans(n_clusters=4, random_state=42, n_init=10))
-    ])
-    df_hist['cluster_incendio'] = pipeline.fit_predict(df_hist)
-    ind_summary = df_hist.groupby('cluster_incendio').agg(
-        num_incendios=('Año', 'count'),
-        duracion_media=('Duración días', 'mean'),
-        impacto_comun=('Tipo impacto', lambda x: x.mode()[0]),
-        causa_comun=('Causa', lambda x: x.mode()[0]),
-        vegetacion_comun=('Tipo Vegetación', lambda x: x.mode()[0])
-    ).reset_index()
+    _, df_hist['cluster_incendio'] = fit_individual_clusters(df_hist, weighted)
+    ind_summary = summarize_incendio_clusters(df_hist)
     
     # Matriz de riesgo histórica
-    risk_matrix = compute_risk_matrix_historical(csv_file)
+    risk_matrix = compute_risk_matrix_historical(csv_file, df, weighted, regional_engine)
     
     return {
         'regional': reg_summary,
@@ -229,6 +348,52 @@ def historical_analysis(csv_file='BD.csv'):
         'risk_matrix': risk_matrix
     }
 
+def historical_analysis_progressive(csv_file='BD.csv', df=None, weighted=False, rollup=None,
+                                    regional_engine='kmeans', sample_size=20_000):
+    """
+    Versión progresiva de historical_analysis para mostrar resultados antes de que termine.
+    Genera tuplas (etapa, resultados) con las mismas claves que historical_analysis:
+      - 'resumen': resumen regional (sin cluster_region), top 10 y ecosistemas;
+        individual y risk_matrix en None.
+      - 'preliminar': clústeres con n_init=1; el individual se ajusta sobre una muestra de
+        sample_size incidentes y se aplica a todos.
+      - 'final': el resultado completo de historical_analysis.
+    """
+    df_hist = get_historical_data(csv_file, df)
+    
+    # Resúmenes: solo agregaciones, sin ajustar modelos
+    reg_summary = summarize_regions(df_hist)
+    ecosistema_summary = get_ecosystem_summary_historical(csv_file, df_hist, rollup)
+    yield 'resumen', {
+        'regional': reg_summary,
+        'individual': None,
+        'top10_regiones': reg_summary.sort_values(by='frecuencia_incendios', ascending=False).head(10),
+        'ecosistema_summary': ecosistema_summary,
+        'risk_matrix': None
+    }
+    
+    # Preliminar: una sola inicialización y el clúster individual sobre una muestra
+    if regional_engine == 'kmeans':
+        prelim_regions = compute_regional_clusters(reg_summary.copy(), n_init=1)
+    else:
+        prelim_regions = cluster_regions(reg_summary.copy(), df_hist, regional_engine)
+    sample = df_hist.sample(n=min(sample_size, len(df_hist)), random_state=42)
+    pipeline = build_individual_pipeline(n_init=1).fit(sample)
+    prelim_data = df_hist.assign(cluster_incendio=pipeline.predict(df_hist))
+    prelim_data = prelim_data.merge(prelim_regions[['Latitud_round','Longitud_round','cluster_region']], 
+                                    on=['Latitud_round','Longitud_round'], how='left')
+    yield 'preliminar', {
+        'regional': prelim_regions,
+        'individual': {'data': prelim_data, 'summary': summarize_incendio_clusters(prelim_data)},
+        'top10_regiones': prelim_regions.sort_values(by='frecuencia_incendios', ascending=False).head(10),
+        'ecosistema_summary': ecosistema_summary,
+        'risk_matrix': model_kernels.crosstab(prelim_data['cluster_region'], prelim_data['cluster_incendio'])
+    }
+    
+    # df_hist ya está cargado (y filtrado): no volver a leer csv_file
+    yield 'final', historical_analysis(csv_file, df_hist, weighted=weighted, rollup=rollup,
+                                       regional_engine=regional_engine)
+
 if __name__ == "__main__":
     # Ejemplo de uso de análisis histórico
     results = historical_analysis()
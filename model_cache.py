@@ -0,0 +1,90 @@
+# model_cache.py
+"""
+Caché de resultados en memoria con presupuesto de bytes.
+
+Se usa para guardar los resultados por año (DataFrames, matrices de riesgo) que
+la interfaz calcula o precalcula en segundo plano. Es segura entre hilos y
+desaloja las entradas menos usadas recientemente cuando se supera el presupuesto.
+Si se le pasa un model_memory.MemoryBudget, además comparte ese presupuesto con
+otras cachés y el desalojo pasa a ser GreedyDual-Size según el costo de cada
+entrada (segundos de cálculo).
+"""
+from model_memory import MemoryBudget, estimate_bytes
+
+
+class ResultCache:
+    """Caché segura entre hilos, acotada por su propio presupuesto de bytes y opcionalmente uno compartido."""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, budget=None, name='resultados'):
+        self.max_bytes = max_bytes
+        self.name = name
+        self.total_bytes = 0
+        # Sin presupuesto compartido, la caché tiene uno propio del mismo tamaño
+        self.budget = budget if budget is not None else MemoryBudget(max_bytes)
+        self.budget.register(self)
+        self._entries = {}  # clave -> [valor, bytes, costo, prioridad, uso]
+        self._lock = self.budget.lock
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key, default=None):
+        """Retorna el valor guardado y renueva su prioridad."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            entry[3] = self.budget.priority(entry[1], entry[2])
+            entry[4] = self.budget.tick()
+            return entry[0]
+
+    def put(self, key, value, cost=None):
+        """
+        Guarda un valor; cost son los segundos que costó calcularlo (None: costo por byte
+        supuesto, ver model_memory.DEFAULT_SECONDS_PER_BYTE).
+        Retorna False si por sí solo excede el presupuesto; en ese caso también se descarta
+        el valor anterior de la clave, para que get no retorne datos desactualizados.
+        """
+        size = estimate_bytes(value)
+        with self._lock:
+            self.discard(key)
+            if size > self.max_bytes or size > self.budget.max_bytes:
+                return False
+            self._entries[key] = [value, size, cost, self.budget.priority(size, cost), self.budget.tick()]
+            self.total_bytes += size
+            self.budget.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                self.evict_one()
+            self.budget.enforce()
+        return True
+
+    def lowest_priority(self):
+        """(prioridad, uso) de la entrada que se desalojaría primero."""
+        with self._lock:
+            return min((entry[3], entry[4]) for entry in self._entries.values())
+
+    def evict_one(self):
+        """Desaloja la entrada de menor prioridad y sube la inflación del presupuesto."""
+        with self._lock:
+            key = min(self._entries, key=lambda k: (self._entries[k][3], self._entries[k][4]))
+            priority = self._entries[key][3]
+            self.discard(key)
+            self.budget.inflation = max(self.budget.inflation, priority)
+
+    def discard(self, key):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+                self.budget.total_bytes -= old[1]
+
+    def clear(self):
+        with self._lock:
+            self.budget.total_bytes -= self.total_bytes
+            self._entries.clear()
+            self.total_bytes = 0
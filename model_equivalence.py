@@ -0,0 +1,463 @@
+# model_equivalence.py
+"""
+Verificación de equivalencia entre la implementación de referencia y las rutas optimizadas.
+
+Las funciones reference_* son una copia congelada del model_backend original
+(KMeans de sklearn, sin cachés ni atajos) y no deben modificarse al optimizar.
+Cada caso de CASES ejecuta la referencia y la ruta rápida actual sobre el mismo
+dataset y compara:
+  - resúmenes: exactamente (mismas filas, columnas y valores),
+  - etiquetas de clúster: iguales salvo permutación de los números de clúster,
+  - matrices de riesgo: iguales salvo permutación de filas y columnas,
+  - imágenes prerrenderizadas: byte a byte con el dibujo en vivo (Agg) de la misma vista,
+  - rutas sobre SQLite (model_sqlite): resúmenes y resultados por año leídos o agregados en
+    SQL y análisis histórico por bloques, igual que sobre el DataFrame o el CSV,
+y reporta el tiempo de ambas y la aceleración medida.
+
+Uso:
+    python model_equivalence.py                     # datasets sintéticos
+    python model_equivalence.py --csv BD.csv --sizes 5000 50000
+Termina con código 1 si algún caso no es equivalente.
+"""
+import argparse
+import io
+import itertools
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+import model_backend
+from model_rollup import SummaryRollup
+
+CATEGORICAL_COLS = ['Causa', 'Tipo impacto', 'Tipo Vegetación']
+NUMERICAL_COLS = ['Duración días', 'Latitud', 'Longitud']
+
+
+# --- Implementación de referencia (congelada) ---
+
+def reference_regional_summary(df, year):
+    data_year = df[df['Año'] == year].copy()
+    if data_year.empty:
+        raise ValueError(f"No hay datos para el año {year}")
+    data_year['Latitud_round'] = data_year['Latitud'].round(1)
+    data_year['Longitud_round'] = data_year['Longitud'].round(1)
+    return data_year.groupby(['Latitud_round', 'Longitud_round']).agg(
+        frecuencia_incendios=('Año', 'count'),
+        duracion_promedio=('Duración días', 'mean'),
+        vegetacion_predominante=('Tipo Vegetación', lambda x: x.mode()[0])
+    ).reset_index()
+
+
+def reference_regional_clusters(region_summary):
+    region_summary = region_summary.copy()
+    veg_encoder = OneHotEncoder(sparse_output=False)
+    veg_encoded = veg_encoder.fit_transform(region_summary[['vegetacion_predominante']])
+    veg_df = pd.DataFrame(veg_encoded, columns=veg_encoder.get_feature_names_out())
+    region_features = pd.concat([
+        region_summary[['frecuencia_incendios', 'duracion_promedio']], veg_df
+    ], axis=1)
+    region_scaled = StandardScaler().fit_transform(region_features)
+    region_summary['cluster_region'] = KMeans(n_clusters=5, random_state=42, n_init=10).fit_predict(region_scaled)
+    return region_summary
+
+
+def _reference_individual_labels(data):
+    preprocessor = ColumnTransformer(transformers=[
+        ('num', StandardScaler(), NUMERICAL_COLS),
+        ('cat', OneHotEncoder(handle_unknown='ignore'), CATEGORICAL_COLS)
+    ])
+    pipeline = Pipeline([
+        ('preprocessor', preprocessor),
+        ('kmeans', KMeans(n_clusters=4, random_state=42, n_init=10))
+    ])
+    return pipeline.fit_predict(data)
+
+
+def reference_individual_summary(df, year):
+    data_year = df[df['Año'] == year].copy()
+    if data_year.empty:
+        raise ValueError(f"No hay datos para el año {year}")
+    data_year['cluster_incendio'] = _reference_individual_labels(data_year)
+    incendio_profiles = data_year.groupby('cluster_incendio').agg(
+        num_incendios=('Año', 'count'),
+        duracion_media=('Duración días', 'mean'),
+        impacto_comun=('Tipo impacto', lambda x: x.mode()[0]),
+        causa_comun=('Causa', lambda x: x.mode()[0]),
+        vegetacion_comun=('Tipo Vegetación', lambda x: x.mode()[0])
+    ).reset_index()
+    return data_year, incendio_profiles
+
+
+def reference_ecosystem_summary(df, year):
+    data_year = df[df['Año'] == year]
+    if data_year.empty:
+        raise ValueError(f"No hay datos para el año {year}")
+    return data_year.groupby('Tipo Vegetación').agg(
+        frecuencia_incendios=('Año', 'count'),
+        duracion_promedio=('Duración días', 'mean')
+    ).sort_values(by='frecuencia_incendios', ascending=False).reset_index()
+
+
+def reference_risk_matrix(df, year):
+    data_year = df[df['Año'] == year].copy()
+    reg_summary = reference_regional_clusters(reference_regional_summary(data_year, year))
+    data_year = data_year.merge(reg_summary[['Latitud_round', 'Longitud_round', 'cluster_region']],
+                                on=['Latitud_round', 'Longitud_round'], how='left')
+    data_year_ind, _ = reference_individual_summary(data_year, year)
+    return pd.crosstab(data_year['cluster_region'], data_year_ind['cluster_incendio'])
+
+
+def reference_year_results(df, year):
+    reg_summary = reference_regional_clusters(reference_regional_summary(df, year))
+    data_year, incendio_profiles = reference_individual_summary(df, year)
+    return {
+        'regional': reg_summary,
+        'individual': {'data': data_year, 'summary': incendio_profiles},
+        'risk_matrix': reference_risk_matrix(df, year)
+    }
+
+
+def reference_risk_matrix_historical(df):
+    df_hist = df[(df['Año'] >= 2015) & (df['Año'] <= 2023)].copy()
+    reg_summary = df_hist.groupby(['Latitud_round', 'Longitud_round']).agg(
+        frecuencia_incendios=('Año', 'count'),
+        duracion_promedio=('Duración días', 'mean'),
+        vegetacion_predominante=('Tipo Vegetación', lambda x: x.mode()[0])
+    ).reset_index()
+    reg_summary = reference_regional_clusters(reg_summary)
+    df_hist = df_hist.merge(reg_summary[['Latitud_round', 'Longitud_round', 'cluster_region']],
+                            on=['Latitud_round', 'Longitud_round'], how='left')
+    df_hist['cluster_incendio'] = _reference_individual_labels(df_hist)
+    return pd.crosstab(df_hist['cluster_region'], df_hist['cluster_incendio'])
+
+
+# --- Datos sintéticos ---
+
+def make_synthetic_incidents(n_rows, seed=0, years=range(2015, 2024)):
+    """Genera incidentes con las columnas de BD.csv ya procesados como load_and_process_data."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Año': rng.choice(list(years), n_rows),
+        'Latitud': np.round(rng.uniform(15, 30, n_rows), 4),
+        'Longitud': np.round(rng.uniform(-115, -88, n_rows), 4),
+        'Duración días': rng.integers(1, 15, n_rows),
+        'Tipo Vegetación': rng.choice(['Arbolado', 'Arbustivo', 'Herbáceo', 'Hojarasca'], n_rows),
+        'Ecosistema': rng.choice(['Templado', 'Tropical', 'Árido', 'Humedal'], n_rows),
+        'Causa': rng.choice(['Agrícola', 'Intencional', 'Fumadores', 'Natural', 'Desconocida'], n_rows),
+        'Tipo impacto': rng.choice(['Mínimo', 'Moderado', 'Severo'], n_rows),
+    })
+    df['Latitud_round'] = df['Latitud'].round(1)
+    df['Longitud_round'] = df['Longitud'].round(1)
+    return df
+
+
+# --- Imágenes de las vistas: dibujo en vivo frente al proceso de renderizado de la interfaz ---
+
+TILE_SIZE = (780, 520)
+_year_results = {}
+_render_executor = None
+
+
+def _year_results_for(df, year):
+    if (id(df), year) not in _year_results:
+        _year_results[(id(df), year)] = model_backend.compute_year_results(df, year)
+    return _year_results[(id(df), year)]
+
+
+def live_render_pngs(df, year):
+    """Dibuja cada vista en este proceso, con el estilo de la interfaz, como el canvas en vivo (Agg)."""
+    import matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    import model_render
+    import model_ui
+
+    results = _year_results_for(df, year)
+    pngs = {}
+    with matplotlib.rc_context():
+        model_ui.apply_matplotlib_style()
+        for view in model_render.VIEWS:
+            fig = Figure(figsize=(TILE_SIZE[0] / model_render.DPI, TILE_SIZE[1] / model_render.DPI),
+                         dpi=model_render.DPI)
+            canvas = FigureCanvasAgg(fig)
+            model_render.draw_view(fig, view, results, year)
+            buffer = io.BytesIO()
+            canvas.print_png(buffer)
+            pngs[view] = buffer.getvalue()
+    return pngs
+
+
+def tile_render_pngs(df, year):
+    """Renderiza las vistas como la interfaz: en un proceso aparte (spawn) con el estilo que recibe."""
+    global _render_executor
+    import matplotlib
+    import model_render
+    import model_ui
+
+    if _render_executor is None:
+        _render_executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+    results = _year_results_for(df, year)
+    with matplotlib.rc_context():
+        model_ui.apply_matplotlib_style()
+        style = model_ui.matplotlib_style()
+    tiles = [(view,) + TILE_SIZE for view in model_render.VIEWS]
+    pngs = _render_executor.submit(model_render.render_pngs, tiles, results, year, style).result()
+    return {view: pngs[tile] for view, tile in zip(model_render.VIEWS, tiles)}
+
+
+# --- Rutas sobre archivos: CSV y base de model_sqlite con los mismos incidentes ---
+
+HISTORICAL_CHUNKSIZE = 1000
+_file_sources = {}
+_tmp_dir = None
+
+
+def _file_sources_for(df):
+    """
+    Escribe una vez por dataset el histórico como CSV y lo importa a SQLite; retorna (csv, db).
+    Solo se escriben los años 2015-2023, así los bloques del CSV y de la tabla son los mismos.
+    """
+    global _tmp_dir
+    import model_sqlite
+
+    if id(df) not in _file_sources:
+        if _tmp_dir is None:
+            _tmp_dir = tempfile.TemporaryDirectory()
+        csv_file = os.path.join(_tmp_dir.name, f'incidentes_{id(df)}.csv')
+        db_file = os.path.join(_tmp_dir.name, f'incidentes_{id(df)}.db')
+        df[(df['Año'] >= 2015) & (df['Año'] <= 2023)].drop(columns=['Latitud_round', 'Longitud_round']).to_csv(
+            csv_file, index=False, encoding='latin1')
+        model_sqlite.import_csv(csv_file, db_file)
+        _file_sources[id(df)] = (csv_file, db_file)
+    return _file_sources[id(df)]
+
+
+# --- Comparaciones (retornan None si son equivalentes o un texto con la diferencia) ---
+
+def compare_frames(ref, fast, rtol=None):
+    """Compara dos DataFrames exactamente (o con tolerancia relativa rtol en los flotantes)."""
+    ref = ref.reset_index(drop=True)
+    fast = fast.reset_index(drop=True)
+    if list(ref.columns) != list(fast.columns):
+        return f"columnas distintas: {list(ref.columns)} vs {list(fast.columns)}"
+    try:
+        pd.testing.assert_frame_equal(ref, fast, check_dtype=False, check_categorical=False,
+                                      check_exact=rtol is None, rtol=rtol or 0)
+    except AssertionError as e:
+        return str(e).splitlines()[0]
+    return None
+
+
+def label_mapping(ref_labels, fast_labels):
+    """Retorna el mapeo etiqueta rápida -> etiqueta de referencia si es una permutación, o None."""
+    ref_labels = np.asarray(ref_labels)
+    fast_labels = np.asarray(fast_labels)
+    if ref_labels.shape != fast_labels.shape:
+        return None
+    pairs = np.unique(np.column_stack([fast_labels, ref_labels]), axis=0)
+    if len(pairs) != len(np.unique(ref_labels)) or len(pairs) != len(np.unique(fast_labels)):
+        return None
+    return dict(pairs.tolist())
+
+
+def compare_labels(ref_labels, fast_labels):
+    if label_mapping(ref_labels, fast_labels) is None:
+        return "las etiquetas no son una permutación de las de referencia"
+    return None
+
+
+def compare_risk_matrices(ref, fast):
+    """Compara dos matrices de riesgo salvo permutación de filas y de columnas."""
+    a, b = ref.to_numpy(), fast.to_numpy()
+    if a.shape != b.shape:
+        return f"forma distinta: {a.shape} vs {b.shape}"
+    # Permutar la dimensión más corta por fuerza bruta y comparar la otra ordenada
+    if a.shape[1] > a.shape[0]:
+        a, b = a.T, b.T
+
+    def sorted_rows(m):
+        return m[np.lexsort(m.T[::-1])]
+
+    target = sorted_rows(a)
+    for perm in itertools.permutations(range(a.shape[1])):
+        if np.array_equal(sorted_rows(b[:, list(perm)]), target):
+            return None
+    return "las matrices no coinciden con ninguna permutación de clústeres"
+
+
+def compare_clustered_summary(ref, fast, label_col, rtol=None):
+    """Compara un resumen con columna de clúster: el resto exacto, la etiqueta salvo permutación."""
+    return (compare_frames(ref.drop(columns=label_col), fast.drop(columns=label_col), rtol)
+            or compare_labels(ref[label_col], fast[label_col]))
+
+
+def compare_individual(ref, fast, rtol=None):
+    """Compara (incidentes, perfiles) del clúster individual reetiquetando los perfiles."""
+    (ref_data, ref_profiles), (fast_data, fast_profiles) = ref, fast
+    mapping = label_mapping(ref_data['cluster_incendio'], fast_data['cluster_incendio'])
+    if mapping is None:
+        return "las etiquetas no son una permutación de las de referencia"
+    fast_profiles = fast_profiles.assign(cluster_incendio=fast_profiles['cluster_incendio'].map(mapping))
+    return compare_frames(ref_profiles.sort_values('cluster_incendio'),
+                          fast_profiles.sort_values('cluster_incendio'), rtol)
+
+
+def compare_pngs(ref, fast):
+    different = [view for view in ref if ref[view] != fast.get(view)]
+    return f"imágenes distintas en las vistas: {', '.join(different)}" if different else None
+
+
+def compare_historical_chunked(ref, fast):
+    """Compara dos resultados de historical_analysis_chunked (sin incidentes individuales)."""
+    return (compare_frames(ref['regional'], fast['regional'])
+            or compare_frames(ref['top10_regiones'], fast['top10_regiones'])
+            or compare_frames(ref['ecosistema_summary'], fast['ecosistema_summary'])
+            or compare_frames(ref['individual']['summary'], fast['individual']['summary'])
+            or compare_frames(ref['risk_matrix'], fast['risk_matrix']))
+
+
+def compare_year_results(ref, fast, rtol=None):
+    return (compare_clustered_summary(ref['regional'], fast['regional'], 'cluster_region', rtol)
+            or compare_individual((ref['individual']['data'], ref['individual']['summary']),
+                                  (fast['individual']['data'], fast['individual']['summary']), rtol)
+            or compare_risk_matrices(ref['risk_matrix'], fast['risk_matrix']))
+
+
+# nombre -> (por año, referencia, ruta rápida, comparación); referencia y ruta rápida reciben (df, año)
+CASES = {
+    'regional_summary': (
+        True, reference_regional_summary, model_backend.get_regional_summary_by_year,
+        compare_frames),
+    'regional_clusters': (
+        True,
+        lambda df, year: reference_regional_clusters(reference_regional_summary(df, year)),
+        lambda df, year: model_backend.compute_regional_clusters(model_backend.get_regional_summary_by_year(df, year)),
+        lambda ref, fast: compare_clustered_summary(ref, fast, 'cluster_region')),
+    'individual': (
+        True, reference_individual_summary, model_backend.get_individual_summary_by_year,
+        compare_individual),
+    'ecosystem_summary': (
+        True, reference_ecosystem_summary,
+        lambda df, year: model_backend.get_ecosystem_summary_by_year(df, year, _rollup_for(df)),
+        # La duración media sale de suma / conteo: puede diferir en el último bit con duraciones no enteras
+        lambda ref, fast: compare_frames(ref, fast, rtol=1e-12)),
+    'risk_matrix': (
+        True, reference_risk_matrix, model_backend.compute_risk_matrix_by_year,
+        compare_risk_matrices),
+    'year_results': (
+        True, reference_year_results, model_backend.compute_year_results,
+        compare_year_results),
+    'risk_matrix_historical': (
+        False,
+        lambda df, year: reference_risk_matrix_historical(df),
+        lambda df, year: model_backend.compute_risk_matrix_historical(df=df),
+        compare_risk_matrices),
+    'regional_summary_sqlite': (
+        True, model_backend.get_regional_summary_by_year,
+        lambda df, year: model_backend.get_regional_summary_by_year(None, year, csv_file=_file_sources_for(df)[1]),
+        # AVG de SQLite frente a la media de pandas: pueden diferir en el último bit con duraciones no enteras
+        lambda ref, fast: compare_frames(ref, fast, rtol=1e-12)),
+    'ecosystem_summary_sqlite': (
+        True, model_backend.get_ecosystem_summary_by_year,
+        lambda df, year: model_backend.get_ecosystem_summary_by_year(None, year, csv_file=_file_sources_for(df)[1]),
+        lambda ref, fast: compare_frames(ref, fast, rtol=1e-12)),
+    'year_results_sqlite': (
+        True, model_backend.compute_year_results,
+        lambda df, year: model_backend.compute_year_results(None, year, csv_file=_file_sources_for(df)[1]),
+        compare_year_results),
+    'historical_chunked_sqlite': (
+        False,
+        lambda df, year: model_backend.historical_analysis(_file_sources_for(df)[0], chunksize=HISTORICAL_CHUNKSIZE),
+        lambda df, year: model_backend.historical_analysis(_file_sources_for(df)[1], chunksize=HISTORICAL_CHUNKSIZE),
+        compare_historical_chunked),
+    'tile_render': (
+        True, live_render_pngs, tile_render_pngs,
+        compare_pngs),
+}
+
+
+# La tabla agregada se construye al cargar los datos: se reutiliza por dataset y no entra en el tiempo
+_rollups = {}
+
+
+def _rollup_for(df):
+    if id(df) not in _rollups:
+        _rollups[id(df)] = SummaryRollup(df)
+    return _rollups[id(df)]
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run_case(name, df, year=None):
+    """Ejecuta un caso y retorna un diccionario con el estado, el detalle y los tiempos."""
+    _, reference, fast, compare = CASES[name]
+    row = {'caso': name, 'año': year}
+    try:
+        ref_out, row['t_referencia'] = _timed(reference, df, year)
+        fast_out, row['t_rapida'] = _timed(fast, df, year)
+        difference = compare(ref_out, fast_out)
+    except Exception as e:
+        row.update(estado='ERROR', detalle=f"{type(e).__name__}: {e}")
+        return row
+    row['aceleracion'] = row['t_referencia'] / row['t_rapida'] if row['t_rapida'] > 0 else np.nan
+    row.update(estado='DIFERENTE' if difference else 'OK', detalle=difference or '')
+    return row
+
+
+def run_harness(datasets, cases=None, years=None):
+    """
+    Ejecuta los casos sobre cada dataset ({nombre: df}). years limita los casos por año
+    (por defecto, todos los años 2015-2023 presentes). Retorna el reporte como DataFrame.
+    """
+    rows = []
+    for dataset, df in datasets.items():
+        dataset_years = years
+        if dataset_years is None:
+            dataset_years = sorted(y for y in df['Año'].unique() if 2015 <= y <= 2023)
+        _rollup_for(df)
+        for name in cases or CASES:
+            per_year = CASES[name][0]
+            for year in (dataset_years if per_year else [None]):
+                rows.append({'dataset': dataset, **run_case(name, df, year)})
+    report = pd.DataFrame(rows, columns=['dataset', 'caso', 'año', 'estado', 't_referencia',
+                                         't_rapida', 'aceleracion', 'detalle'])
+    report['año'] = report['año'].astype('Int64')
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara la implementación de referencia con las rutas optimizadas")
+    parser.add_argument('--csv', help="Dataset real adicional (por ejemplo BD.csv)")
+    parser.add_argument('--sizes', type=int, nargs='*', default=[5000, 20000],
+                        help="Tamaños de los datasets sintéticos")
+    parser.add_argument('--cases', nargs='*', choices=list(CASES), help="Casos a ejecutar (por defecto todos)")
+    parser.add_argument('--years', type=int, nargs='*', help="Años para los casos por año")
+    args = parser.parse_args()
+
+    datasets = {f'sintetico_{n}': make_synthetic_incidents(n) for n in args.sizes}
+    if args.csv:
+        datasets[args.csv] = model_backend.load_and_process_data(args.csv)
+
+    report = run_harness(datasets, args.cases, args.years)
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    print("\nAceleración media por caso:")
+    print(report.groupby('caso', sort=False)['aceleracion'].mean().to_string(float_format=lambda x: f"{x:.2f}x"))
+    failed = report[report['estado'] != 'OK']
+    if not failed.empty:
+        print(f"\n{len(failed)} comparaciones no equivalentes")
+        sys.exit(1)
+    print("\nTodas las rutas optimizadas son equivalentes a la referencia")
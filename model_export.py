@@ -0,0 +1,61 @@
+# model_export.py
+"""
+Exportación masiva de las asignaciones de clúster por incidente a Parquet.
+
+Escribe cada incidente con su clúster regional, su clúster individual y su
+celda de la matriz de riesgo en un dataset Parquet particionado por año
+(directorios Año=AAAA, estilo Hive). Cada año se calcula y se escribe por
+separado, así que en memoria solo hay un año a la vez, y los análisis
+posteriores pueden leer las etiquetas sin volver a pasar por model_backend.
+
+Requiere pyarrow (pip install pyarrow).
+
+Uso:
+    python model_export.py BD.csv etiquetas/
+"""
+import argparse
+import os
+
+from model_backend import compute_year_results, load_and_process_data
+
+
+def year_assignments(df, year):
+    """Retorna los incidentes del año con cluster_region, cluster_incendio, celda_riesgo y riesgo."""
+    results = compute_year_results(df, year)
+    incidents = results['individual']['data']
+    risk = results['risk_matrix'].stack().rename('riesgo')
+    incidents = incidents.join(risk, on=['cluster_region', 'cluster_incendio'])
+    incidents['celda_riesgo'] = (incidents['cluster_region'].astype(str) + '-'
+                                 + incidents['cluster_incendio'].astype(str))
+    return incidents
+
+
+def export_cluster_assignments(df, output_dir, years=None):
+    """
+    Escribe las asignaciones de cada año en output_dir/Año=AAAA/part-0.parquet.
+    Retorna la lista de archivos escritos.
+    """
+    if years is None:
+        years = sorted(df['Año'].unique())
+    written = []
+    for year in years:
+        incidents = year_assignments(df, year)
+        partition_dir = os.path.join(output_dir, f'Año={int(year)}')
+        os.makedirs(partition_dir, exist_ok=True)
+        path = os.path.join(partition_dir, 'part-0.parquet')
+        # Escribir a un temporal y renombrar, para que un lector nunca vea un archivo a medias
+        tmp_path = path + '.tmp'
+        incidents.drop(columns='Año').to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        written.append(path)
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta las asignaciones de clúster por incidente a Parquet")
+    parser.add_argument('csv_file', nargs='?', default='BD.csv')
+    parser.add_argument('output_dir', nargs='?', default='etiquetas')
+    args = parser.parse_args()
+    df = load_and_process_data(args.csv_file)
+    for path in export_cluster_assignments(df, args.output_dir):
+        print(f"Escrito {path}")
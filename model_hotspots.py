@@ -0,0 +1,130 @@
+# model_hotspots.py
+"""
+Detección de focos (hotspots) por densidad como motor alternativo de clústeres regionales.
+
+En lugar de KMeans sobre las celdas de 0.1°, aplica un DBSCAN sobre las
+coordenadas de cada incendio con distancia haversine: un incendio es núcleo si
+tiene al menos min_samples incendios (incluido él) a menos de eps_km, los
+núcleos a menos de eps_km entre sí forman un mismo foco y los incendios que no
+son núcleo toman el foco del núcleo más cercano a su alcance; el resto es ruido
+(-1). El número de focos no se fija de antemano.
+
+Las consultas de vecinos usan un BallTree y se hacen por bloques de chunksize
+puntos. El árbol trabaja sobre los puntos en la esfera unitaria (x, y, z) con
+radio de cuerda 2·sin(eps/2R): la cuerda crece con la distancia haversine, así
+que los vecinos son los mismos y la consulta euclidiana es unas tres veces más
+rápida que con metric='haversine'. Los focos se unen bloque a bloque como
+componentes conexas, así que la memoria depende del bloque y no del año
+completo. Los focos se numeran de mayor a menor número de núcleos.
+
+assign_hotspot_regions conserva el contrato de compute_regional_clusters: añade
+cluster_region a cada celda (el foco más frecuente entre sus incendios), de modo
+que la matriz de riesgo funciona igual, con una fila -1 para el ruido.
+"""
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from sklearn.neighbors import BallTree
+
+import model_kernels
+
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_EPS_KM = 10.0
+DEFAULT_MIN_SAMPLES = 5
+
+
+def unit_vectors(lat, lon):
+    """Coordenadas en grados a puntos (x, y, z) de la esfera unitaria."""
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def chord_radius(eps_km):
+    """Radio euclidiano en la esfera unitaria equivalente a eps_km de distancia haversine."""
+    return 2 * np.sin(eps_km / EARTH_RADIUS_KM / 2)
+
+
+def _neighbor_pairs(tree, coords, block, radius, sort_results=False):
+    """Pares (punto del bloque, vecino) a menos de radius, en arreglos planos."""
+    neighbors = tree.query_radius(coords[block], radius, return_distance=sort_results,
+                                  sort_results=sort_results)
+    if sort_results:
+        neighbors = neighbors[0]
+    sizes = np.fromiter((len(n) for n in neighbors), dtype=np.int64, count=len(neighbors))
+    if sizes.sum() == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.repeat(block, sizes), np.concatenate(neighbors).astype(np.int64)
+
+
+def detect_hotspots(lat, lon, eps_km=DEFAULT_EPS_KM, min_samples=DEFAULT_MIN_SAMPLES, chunksize=50_000):
+    """Retorna el foco de cada incendio (0, 1, ... por tamaño) o -1 si es ruido."""
+    coords = unit_vectors(lat, lon)
+    n = len(coords)
+    labels = np.full(n, -1, dtype=np.int64)
+    if n == 0:
+        return labels
+    tree = BallTree(coords)
+    radius = chord_radius(eps_km)
+
+    # 1) Núcleos: incendios con suficientes vecinos
+    counts = np.concatenate([
+        tree.query_radius(coords[start:start + chunksize], radius, count_only=True)
+        for start in range(0, n, chunksize)
+    ])
+    core = counts >= min_samples
+    core_idx = np.flatnonzero(core)
+    if len(core_idx) == 0:
+        return labels
+
+    # 2) Focos: componentes conexas entre núcleos, uniendo bloque a bloque. Cada punto queda
+    # enlazado al primer punto de su componente, así el grafo de cada paso solo tiene las
+    # aristas del bloque más n enlaces al representante.
+    representative = np.arange(n)
+    for start in range(0, len(core_idx), chunksize):
+        src, dst = _neighbor_pairs(tree, coords, core_idx[start:start + chunksize], radius)
+        keep = core[dst]
+        rows = np.concatenate([src[keep], np.arange(n)])
+        cols = np.concatenate([dst[keep], representative])
+        graph = sp.coo_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(n, n))
+        _, component = connected_components(graph, directed=False)
+        _, first = np.unique(component, return_index=True)
+        representative = first[component]
+
+    # Numerar los focos por número de núcleos, de mayor a menor
+    _, inverse, sizes = np.unique(representative[core_idx], return_inverse=True, return_counts=True)
+    rank = np.empty(len(sizes), dtype=np.int64)
+    rank[np.argsort(-sizes, kind='stable')] = np.arange(len(sizes))
+    labels[core_idx] = rank[inverse.ravel()]
+
+    # 3) Borde: incendios no núcleo con algún núcleo a su alcance toman el foco del más cercano
+    border_idx = np.flatnonzero(~core & (counts > 1))
+    for start in range(0, len(border_idx), chunksize):
+        src, dst = _neighbor_pairs(tree, coords, border_idx[start:start + chunksize], radius,
+                                   sort_results=True)
+        keep = core[dst]
+        src, dst = src[keep], dst[keep]
+        # Los vecinos vienen ordenados por distancia: el primero de cada punto es el más cercano
+        points, first = np.unique(src, return_index=True)
+        labels[points] = labels[dst[first]]
+    return labels
+
+
+def assign_hotspot_regions(region_summary, data, eps_km=DEFAULT_EPS_KM, min_samples=DEFAULT_MIN_SAMPLES,
+                           chunksize=50_000):
+    """
+    Añade cluster_region al resumen por celda a partir de los focos de los incidentes de data:
+    cada celda toma el foco más frecuente entre sus incendios (-1 si predomina el ruido).
+    """
+    labels = detect_hotspots(data['Latitud'], data['Longitud'], eps_km, min_samples, chunksize)
+    cells, first = model_kernels.grid_cells(data['Latitud_round'], data['Longitud_round'])
+    cell_regions = pd.DataFrame({
+        'Latitud_round': data['Latitud_round'].to_numpy()[first],
+        'Longitud_round': data['Longitud_round'].to_numpy()[first],
+        'cluster_region': np.asarray(model_kernels.group_mode(cells, len(first), labels))
+    })
+    merged = region_summary[['Latitud_round', 'Longitud_round']].merge(
+        cell_regions, on=['Latitud_round', 'Longitud_round'], how='left')
+    region_summary['cluster_region'] = merged['cluster_region'].to_numpy()
+    return region_summary
@@ -0,0 +1,155 @@
+# model_kernels.py
+"""
+Núcleos numéricos del backend sobre arreglos NumPy, compilados con Numba si está instalado.
+
+Cubren las tres operaciones más repetidas de model_backend:
+  - agrupar incidentes por celda de 0.1° (grid_cells),
+  - la moda de una columna categórica por grupo (group_mode),
+  - el conteo de pares región x clúster de la matriz de riesgo (crosstab).
+Sin Numba se usan las versiones vectorizadas con NumPy (np.unique, np.bincount),
+que dan exactamente el mismo resultado. Ambas reproducen las salidas de pandas
+(groupby, Series.mode()[0], pd.crosstab) para que los resúmenes no cambien.
+
+Benchmark frente a la ruta de pandas:
+    python model_kernels.py --sizes 10000 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+def _grid_keys_numpy(lat_round, lon_round):
+    ilat = np.rint(lat_round * 10).astype(np.int64)
+    ilon = np.rint(lon_round * 10).astype(np.int64)
+    ilon -= ilon.min()
+    return (ilat - ilat.min()) * (ilon.max() + 1) + ilon
+
+
+def _pair_counts_numpy(a, b, n_a, n_b):
+    return np.bincount(a * n_b + b, minlength=n_a * n_b).reshape(n_a, n_b)
+
+
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def _grid_keys(lat_round, lon_round):
+        n = lat_round.shape[0]
+        ilat = np.empty(n, dtype=np.int64)
+        ilon = np.empty(n, dtype=np.int64)
+        for i in range(n):
+            ilat[i] = np.int64(np.rint(lat_round[i] * 10))
+            ilon[i] = np.int64(np.rint(lon_round[i] * 10))
+        lat_min, lon_min, lon_max = ilat.min(), ilon.min(), ilon.max()
+        keys = np.empty(n, dtype=np.int64)
+        for i in range(n):
+            keys[i] = (ilat[i] - lat_min) * (lon_max - lon_min + 1) + (ilon[i] - lon_min)
+        return keys
+
+    @njit(cache=True)
+    def _pair_counts(a, b, n_a, n_b):
+        counts = np.zeros((n_a, n_b), dtype=np.int64)
+        for i in range(a.shape[0]):
+            counts[a[i], b[i]] += 1
+        return counts
+else:
+    _grid_keys = _grid_keys_numpy
+    _pair_counts = _pair_counts_numpy
+
+
+def grid_cells(lat_round, lon_round):
+    """
+    Agrupa coordenadas ya redondeadas a 0.1° por celda.
+    Retorna (id de celda de cada fila, posición de la primera fila de cada celda); los ids
+    siguen el orden (latitud, longitud), el mismo que groupby(['Latitud_round', 'Longitud_round']).
+    """
+    keys = _grid_keys(np.asarray(lat_round, dtype=np.float64), np.asarray(lon_round, dtype=np.float64))
+    _, first, cells = np.unique(keys, return_index=True, return_inverse=True)
+    return cells.ravel(), first
+
+
+def group_counts(groups, n_groups):
+    return np.bincount(groups, minlength=n_groups)
+
+
+def group_mean(groups, n_groups, values):
+    """Media por grupo. Con valores enteros la suma es exacta; con flotantes se usa pandas (suma compensada)."""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.integer):
+        return np.bincount(groups, weights=values, minlength=n_groups) / group_counts(groups, n_groups)
+    return pd.Series(values).groupby(groups).mean().reindex(range(n_groups)).to_numpy()
+
+
+def group_mode(groups, n_groups, values):
+    """Valor más frecuente por grupo; en empate, el menor (igual que Series.mode()[0])."""
+    codes, uniques = pd.factorize(values, sort=True)
+    counts = _pair_counts(groups.astype(np.int64), codes.astype(np.int64), n_groups, len(uniques))
+    return uniques.take(counts.argmax(axis=1))
+
+
+def crosstab(rows, columns):
+    """Equivalente a pd.crosstab(rows, columns) para dos Series alineadas sin valores nulos."""
+    row_values, row_codes = np.unique(np.asarray(rows), return_inverse=True)
+    col_values, col_codes = np.unique(np.asarray(columns), return_inverse=True)
+    counts = _pair_counts(row_codes.ravel().astype(np.int64), col_codes.ravel().astype(np.int64),
+                          len(row_values), len(col_values))
+    return pd.DataFrame(counts,
+                        index=pd.Index(row_values, name=getattr(rows, 'name', None)),
+                        columns=pd.Index(col_values, name=getattr(columns, 'name', None)))
+
+
+def _bench(func, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def cell_modes(df):
+    cells, first = grid_cells(df['Latitud_round'], df['Longitud_round'])
+    return group_mode(cells, len(first), df['Tipo Vegetación'])
+
+
+if __name__ == "__main__":
+    from model_equivalence import make_synthetic_incidents
+
+    parser = argparse.ArgumentParser(description="Compara los núcleos con la ruta de pandas")
+    parser.add_argument('--sizes', type=int, nargs='*', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"Numba disponible: {HAVE_NUMBA}")
+    for n in args.sizes:
+        df = make_synthetic_incidents(n)
+        labels = pd.Series(np.random.default_rng(0).integers(0, 4, n), name='cluster_incendio')
+        regions = pd.Series(np.random.default_rng(1).integers(0, 5, n), name='cluster_region')
+        cases = {
+            'celdas + moda vegetación': (
+                lambda: df.groupby(['Latitud_round', 'Longitud_round']).agg(
+                    vegetacion_predominante=('Tipo Vegetación', lambda x: x.mode()[0])),
+                lambda: cell_modes(df)),
+            'moda por clúster (3 columnas)': (
+                lambda: df.groupby(labels.to_numpy()).agg(
+                    impacto_comun=('Tipo impacto', lambda x: x.mode()[0]),
+                    causa_comun=('Causa', lambda x: x.mode()[0]),
+                    vegetacion_comun=('Tipo Vegetación', lambda x: x.mode()[0])),
+                lambda: [group_mode(labels.to_numpy(), 4, df[col])
+                         for col in ('Tipo impacto', 'Causa', 'Tipo Vegetación')]),
+            'matriz de riesgo': (
+                lambda: pd.crosstab(regions, labels),
+                lambda: crosstab(regions, labels)),
+        }
+        # Compilar los núcleos (si hay Numba) antes de medir
+        crosstab(regions, labels)
+        cell_modes(df)
+        for name, (pandas_path, kernel_path) in cases.items():
+            t_pandas, t_kernel = _bench(pandas_path), _bench(kernel_path)
+            print(f"n={n:>9}  {name:<30} pandas {t_pandas * 1000:9.2f} ms   "
+                  f"núcleo {t_kernel * 1000:9.2f} ms   {t_pandas / t_kernel:6.1f}x")
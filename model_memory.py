@@ -0,0 +1,104 @@
+# model_memory.py
+"""
+Contabilidad de memoria compartida entre las cachés de la aplicación.
+
+estimate_bytes estima lo que ocupa cada valor guardado (DataFrames, arreglos,
+imágenes, figuras de matplotlib y modelos de sklearn). MemoryBudget fija un
+presupuesto total para varias cachés (model_cache.ResultCache) y, cuando se
+supera, desaloja con la política GreedyDual-Size: cada entrada tiene prioridad
+L + costo / bytes, donde costo son los segundos que llevó calcularla y L sube
+hasta la prioridad de cada entrada desalojada. Se descarta primero lo que es
+grande y barato de recalcular, y lo que lleva tiempo sin usarse va perdiendo
+prioridad frente a lo reciente. Las entradas sin costo conocido se valoran a
+DEFAULT_SECONDS_PER_BYTE, en la misma escala que las demás.
+"""
+import itertools
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Costo supuesto de recalcular una entrada sin costo medido (~10 ms por MB)
+DEFAULT_SECONDS_PER_BYTE = 1e-8
+
+
+def estimate_bytes(obj):
+    """Estima los bytes que ocupa un valor (DataFrames, arreglos, figuras, modelos y contenedores)."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_bytes(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(estimate_bytes(v) for v in obj)
+    if hasattr(obj, 'get_size_inches') and hasattr(obj, 'dpi'):
+        # Figura de matplotlib: domina el búfer RGBA del render
+        width, height = obj.get_size_inches() * obj.dpi
+        return int(width * height * 4)
+    if hasattr(obj, 'get_params') and hasattr(obj, '__dict__'):
+        # Estimador de sklearn: sus atributos ajustados (centroides, escalas, categorías)
+        return sys.getsizeof(obj) + sum(estimate_bytes(v) for v in vars(obj).values())
+    return sys.getsizeof(obj)
+
+
+class MemoryBudget:
+    """Presupuesto de bytes compartido por varias cachés, con desalojo GreedyDual-Size."""
+
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.inflation = 0.0
+        # Un solo candado para el presupuesto y todas sus cachés: el desalojo cruza cachés
+        self.lock = threading.RLock()
+        self._caches = []
+        self._ticks = itertools.count()
+
+    def register(self, cache):
+        with self.lock:
+            self._caches.append(cache)
+
+    def unregister(self, cache):
+        with self.lock:
+            if cache in self._caches:
+                self._caches.remove(cache)
+
+    def priority(self, size, cost=None):
+        """
+        Prioridad de una entrada recién usada. Sin costo conocido se usa DEFAULT_SECONDS_PER_BYTE:
+        entre esas entradas el orden es el de uso (LRU) y compiten con las de costo medido.
+        """
+        if cost is None:
+            return self.inflation + DEFAULT_SECONDS_PER_BYTE
+        return self.inflation + cost / max(size, 1)
+
+    def tick(self):
+        """Número creciente para desempatar por antigüedad de uso."""
+        return next(self._ticks)
+
+    def enforce(self):
+        """Desaloja las entradas de menor prioridad de todas las cachés hasta cumplir el presupuesto."""
+        with self.lock:
+            while self.total_bytes > self.max_bytes:
+                candidates = [(cache.lowest_priority(), cache) for cache in self._caches if len(cache)]
+                if not candidates:
+                    break
+                _, cache = min(candidates, key=lambda candidate: candidate[0])
+                cache.evict_one()
+
+    def usage(self):
+        """Retorna {nombre de caché: (bytes, entradas)} de las cachés registradas."""
+        with self.lock:
+            return {cache.name: (cache.total_bytes, len(cache)) for cache in self._caches}
+
+
+def format_usage(budget):
+    """Texto breve del uso de memoria para la barra de estado."""
+    mb = 1024 * 1024
+    parts = ", ".join(f"{name} {size / mb:.1f}" for name, (size, _) in budget.usage().items())
+    return f"Memoria caché: {budget.total_bytes / mb:.1f} / {budget.max_bytes / mb:.0f} MB ({parts})"
@@ -0,0 +1,162 @@
+# model_outofcore.py
+"""
+Análisis histórico fuera de memoria (out-of-core).
+
+En lugar de cargar todo el histórico en un DataFrame, el CSV (o la tabla de una
+base de model_sqlite) se recorre por bloques (chunks) varias veces:
+  1. Agregados por celda y por ecosistema, estadísticas del escalador
+     (StandardScaler.partial_fit) y categorías de las columnas categóricas.
+  2. Ajuste incremental del clúster individual con MiniBatchKMeans.partial_fit.
+  3. Asignación de clústeres por bloque para los perfiles individuales y la
+     matriz de riesgo.
+La memoria máxima depende del tamaño de bloque y del número de celdas, no del
+tamaño total del histórico.
+"""
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler, OneHotEncoder
+
+import model_sqlite
+from model_backend import compute_regional_clusters
+
+CATEGORICAL_COLS = ['Causa', 'Tipo impacto', 'Tipo Vegetación']
+NUMERICAL_COLS = ['Duración días', 'Latitud', 'Longitud']
+CELL_COLS = ['Latitud_round', 'Longitud_round']
+
+
+def iter_historical_chunks(csv_file='BD.csv', chunksize=100_000):
+    """
+    Recorre el CSV por bloques aplicando el mismo preprocesamiento que load_and_process_data.
+    Con una base de model_sqlite, los bloques salen de la tabla ya preprocesada y filtrada por años en SQL.
+    """
+    if model_sqlite.is_sqlite_file(csv_file):
+        for chunk in model_sqlite.iter_incidents(csv_file, chunksize, years=(2015, 2023)):
+            if not chunk.empty:
+                yield chunk
+        return
+    for chunk in pd.read_csv(csv_file, encoding='latin1', chunksize=chunksize):
+        chunk = chunk.dropna()
+        chunk = chunk[(chunk['Año'] >= 2015) & (chunk['Año'] <= 2023)].copy()
+        if chunk.empty:
+            continue
+        chunk['Latitud_round'] = chunk['Latitud'].round(1)
+        chunk['Longitud_round'] = chunk['Longitud'].round(1)
+        yield chunk
+
+
+def accumulate_counts(total, part):
+    """Suma dos agregados indexados, conservando los tipos enteros de los conteos."""
+    if total is None:
+        return part
+    return pd.concat([total, part]).groupby(level=list(range(part.index.nlevels))).sum()
+
+
+def mode_from_counts(counts, group_level, value_name):
+    """
+    Obtiene la moda por grupo a partir de una serie de conteos indexada por (grupo..., valor).
+    En caso de empate elige el valor menor, igual que Series.mode()[0].
+    """
+    frame = counts.rename('n').reset_index()
+    frame = frame.sort_values(group_level + ['n', value_name], ascending=[True] * len(group_level) + [False, True])
+    return frame.drop_duplicates(subset=group_level).set_index(group_level)[value_name]
+
+
+class _ChunkTransformer:
+    """Equivalente al ColumnTransformer del clúster individual, ajustado de forma incremental."""
+
+    def __init__(self):
+        self.scaler = StandardScaler()
+        self.categories = {col: set() for col in CATEGORICAL_COLS}
+        self.encoder = None
+
+    def partial_fit(self, chunk):
+        self.scaler.partial_fit(chunk[NUMERICAL_COLS])
+        for col in CATEGORICAL_COLS:
+            self.categories[col].update(chunk[col].unique())
+
+    def finalize(self):
+        categories = [sorted(self.categories[col]) for col in CATEGORICAL_COLS]
+        self.encoder = OneHotEncoder(categories=categories, handle_unknown='ignore', sparse_output=False)
+        self.encoder.fit(pd.DataFrame({col: [cats[0]] for col, cats in zip(CATEGORICAL_COLS, categories)}))
+
+    def transform(self, chunk):
+        return np.hstack([
+            self.scaler.transform(chunk[NUMERICAL_COLS]),
+            self.encoder.transform(chunk[CATEGORICAL_COLS])
+        ])
+
+
+def historical_analysis_chunked(csv_file='BD.csv', chunksize=100_000, n_epochs=2):
+    """
+    Versión out-of-core de historical_analysis: retorna las mismas claves, pero
+    ['individual']['data'] es None porque nunca se materializa el histórico completo.
+    """
+    # Pasada 1: agregados por celda/ecosistema y estadísticas del preprocesador
+    cell_veg = None
+    veg_stats = None
+    transformer = _ChunkTransformer()
+    for chunk in iter_historical_chunks(csv_file, chunksize):
+        cell_veg = accumulate_counts(cell_veg, chunk.groupby(CELL_COLS + ['Tipo Vegetación']).agg(
+            n=('Año', 'count'), dur=('Duración días', 'sum')))
+        veg_stats = accumulate_counts(veg_stats, chunk.groupby('Tipo Vegetación').agg(
+            n=('Año', 'count'), dur=('Duración días', 'sum')))
+        transformer.partial_fit(chunk)
+    if cell_veg is None:
+        raise ValueError("No hay datos históricos entre 2015 y 2023")
+    transformer.finalize()
+
+    # Regional
+    cell_totals = cell_veg.groupby(level=CELL_COLS).sum()
+    reg_summary = pd.DataFrame({
+        'frecuencia_incendios': cell_totals['n'],
+        'duracion_promedio': cell_totals['dur'] / cell_totals['n'],
+        'vegetacion_predominante': mode_from_counts(cell_veg['n'], CELL_COLS, 'Tipo Vegetación')
+    }).reset_index()
+    reg_summary = compute_regional_clusters(reg_summary)
+
+    # Top 10 regiones
+    top10 = reg_summary.sort_values(by='frecuencia_incendios', ascending=False).head(10)
+
+    # Ecosistema
+    ecosistema_summary = pd.DataFrame({
+        'frecuencia_incendios': veg_stats['n'],
+        'duracion_promedio': veg_stats['dur'] / veg_stats['n']
+    }).sort_values(by='frecuencia_incendios', ascending=False).reset_index()
+
+    # Pasada 2: clúster individual por mini-lotes
+    kmeans = MiniBatchKMeans(n_clusters=4, random_state=42)
+    for _ in range(n_epochs):
+        for chunk in iter_historical_chunks(csv_file, chunksize):
+            kmeans.partial_fit(transformer.transform(chunk))
+
+    # Pasada 3: perfiles individuales y matriz de riesgo
+    region_of_cell = reg_summary.set_index(CELL_COLS)['cluster_region']
+    ind_stats = None
+    mode_counts = {col: None for col in CATEGORICAL_COLS}
+    risk_counts = None
+    for chunk in iter_historical_chunks(csv_file, chunksize):
+        chunk['cluster_incendio'] = kmeans.predict(transformer.transform(chunk))
+        ind_stats = accumulate_counts(ind_stats, chunk.groupby('cluster_incendio').agg(
+            n=('Año', 'count'), dur=('Duración días', 'sum')))
+        for col in CATEGORICAL_COLS:
+            mode_counts[col] = accumulate_counts(mode_counts[col], chunk.groupby(['cluster_incendio', col]).size())
+        chunk = chunk.join(region_of_cell, on=CELL_COLS)
+        risk_counts = accumulate_counts(risk_counts, chunk.groupby(['cluster_region', 'cluster_incendio']).size())
+
+    ind_summary = pd.DataFrame({
+        'num_incendios': ind_stats['n'],
+        'duracion_media': ind_stats['dur'] / ind_stats['n'],
+        'impacto_comun': mode_from_counts(mode_counts['Tipo impacto'], ['cluster_incendio'], 'Tipo impacto'),
+        'causa_comun': mode_from_counts(mode_counts['Causa'], ['cluster_incendio'], 'Causa'),
+        'vegetacion_comun': mode_from_counts(mode_counts['Tipo Vegetación'], ['cluster_incendio'], 'Tipo Vegetación')
+    }).reset_index()
+    risk_matrix = risk_counts.unstack(fill_value=0)
+
+    return {
+        'regional': reg_summary,
+        'individual': {'data': None, 'summary': ind_summary},
+        'top10_regiones': top10,
+        'ecosistema_summary': ecosistema_summary,
+        'risk_matrix': risk_matrix
+    }
@@ -0,0 +1,77 @@
+# model_predictor.py
+"""
+Clasificador persistente de incidentes nuevos contra los modelos ajustados.
+
+IncidentPredictor conserva lo que model_backend descarta tras cada ajuste: las
+celdas regionales con su clúster (indexadas en un KD-tree), el pipeline
+individual ajustado y la matriz de riesgo. Con ello responde por lotes, sin
+reajustar nada, a qué clúster regional, clúster individual y celda de riesgo
+pertenece cada incendio nuevo.
+"""
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+
+from model_backend import (build_individual_pipeline, compute_regional_clusters,
+                           get_historical_data, summarize_regions)
+
+
+class IncidentPredictor:
+    """Asigna clúster regional, clúster individual y riesgo a lotes de incidentes nuevos."""
+
+    def __init__(self, reg_summary, pipeline, risk_matrix, year=None):
+        self.year = year
+        self.pipeline = pipeline
+        self.cells = reg_summary[['Latitud_round', 'Longitud_round']].to_numpy(dtype=float)
+        self.cell_regions = reg_summary['cluster_region'].to_numpy()
+        self.risk_matrix = risk_matrix
+        # Matriz densa (región x clúster individual) para consultar el riesgo de forma vectorizada
+        n_regions = int(self.cell_regions.max()) + 1
+        n_individual = pipeline.named_steps['kmeans'].n_clusters
+        self.risk_values = risk_matrix.reindex(index=range(n_regions), columns=range(n_individual),
+                                               fill_value=0).to_numpy()
+        self.tree = KDTree(self.cells)
+
+    @classmethod
+    def fit(cls, df, year=None):
+        """Ajusta los modelos para un año o, si year es None, para el histórico 2015-2023."""
+        if year is None:
+            data = get_historical_data(df=df)
+        else:
+            data = df[df['Año'] == year]
+            if data.empty:
+                raise ValueError(f"No hay datos para el año {year}")
+        reg_summary = compute_regional_clusters(summarize_regions(data))
+        pipeline = build_individual_pipeline()
+        incidents = data.assign(cluster_incendio=pipeline.fit_predict(data))
+        incidents = incidents.merge(reg_summary[['Latitud_round', 'Longitud_round', 'cluster_region']],
+                                    on=['Latitud_round', 'Longitud_round'], how='left')
+        risk_matrix = pd.crosstab(incidents['cluster_region'], incidents['cluster_incendio'])
+        return cls(reg_summary, pipeline, risk_matrix, year)
+
+    def predict(self, incidents):
+        """
+        Clasifica un lote de incidentes (columnas Latitud, Longitud, Duración días, Causa,
+        Tipo impacto y Tipo Vegetación). Retorna un DataFrame alineado con la entrada con
+        cluster_region, cluster_incendio, riesgo (incidentes en esa celda de la matriz) y
+        distancia_celda (grados hasta la celda regional conocida más cercana).
+        """
+        incidents = pd.DataFrame(incidents)
+        coords = np.column_stack([incidents['Latitud'].round(1), incidents['Longitud'].round(1)])
+        distance, nearest = self.tree.query(coords, k=1)
+        cluster_region = self.cell_regions[nearest[:, 0]]
+        cluster_incendio = self.pipeline.predict(incidents)
+        return pd.DataFrame({
+            'cluster_region': cluster_region,
+            'cluster_incendio': cluster_incendio,
+            'riesgo': self.risk_values[cluster_region, cluster_incendio],
+            'distancia_celda': distance[:, 0]
+        }, index=incidents.index)
+
+    def save(self, path):
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
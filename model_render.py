@@ -0,0 +1,132 @@
+# model_render.py
+"""
+Dibujo de las vistas por año y renderizado fuera de pantalla a PNG.
+
+Las funciones draw_* dibujan una vista sobre cualquier Figure de matplotlib, de
+modo que la interfaz las usa tanto para el canvas interactivo (TkAgg) como para
+prerrenderizar imágenes con el backend Agg. El prerrenderizado corre en un
+proceso aparte (render_pngs), porque matplotlib no es seguro entre hilos y el
+hilo de Tk dibuja a la vez; ese proceso no hereda el estilo (rcParams) de la
+interfaz, así que render_pngs lo recibe y lo aplica con rc_context. Las
+imágenes se guardan en una caché con clave (vista, año, tamaño, parámetros) y
+la interfaz las muestra directamente en Tk sin volver a ejecutar seaborn.
+"""
+import io
+
+import matplotlib
+import seaborn as sns
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+DPI = 100
+
+
+# Columnas y estilo de los mapas de puntos (clusters regionales e individuales)
+SCATTER_STYLES = {
+    'regional': {'x': 'Longitud_round', 'y': 'Latitud_round', 'hue': 'cluster_region',
+                 'size': 'frecuencia_incendios', 'sizes': (20, 200), 'palette': 'viridis', 'alpha': 0.7},
+    'individual': {'x': 'Longitud', 'y': 'Latitud', 'hue': 'cluster_incendio',
+                   'size': 'Duración días', 'sizes': (10, 100), 'palette': 'plasma', 'alpha': 0.5},
+}
+
+
+def scatter_points(ax, view, data, full_data=None):
+    """
+    Dibuja los puntos de un mapa. Las escalas de color y tamaño se fijan con full_data
+    (por defecto, los mismos datos), para que un subconjunto conserve los colores y
+    tamaños que tenía en el mapa completo.
+    """
+    style = SCATTER_STYLES[view]
+    full_data = data if full_data is None else full_data
+    sns.scatterplot(
+        data=data, ax=ax,
+        hue_norm=(full_data[style['hue']].min(), full_data[style['hue']].max()),
+        size_norm=(full_data[style['size']].min(), full_data[style['size']].max()),
+        legend=False,  # La leyenda se muestra en el panel izquierdo
+        **style
+    )
+
+
+def redraw_points(ax, view, visible, full_data):
+    """Sustituye los puntos del mapa por los visibles, sin cambiar los límites de los ejes."""
+    for collection in list(ax.collections):
+        collection.remove()
+    ax.set_autoscale_on(False)
+    if not visible.empty:
+        scatter_points(ax, view, visible, full_data)
+
+
+def _draw_map(fig, view, data, title):
+    fig.clear()
+    ax = fig.add_subplot(111)
+    scatter_points(ax, view, data)
+    ax.set_title(title, fontsize=16, pad=20)
+    ax.set_xlabel('Longitud', fontsize=14)
+    ax.set_ylabel('Latitud', fontsize=14)
+    ax.set_aspect('equal')  # Mantener la proporción correcta
+    fig.tight_layout()
+
+
+def draw_regional_clusters(fig, reg_summary, year):
+    _draw_map(fig, 'regional', reg_summary, f'Clusters Regionales - Año {year}')
+
+
+def draw_individual_clusters(fig, data_year, year):
+    _draw_map(fig, 'individual', data_year, f'Clusters Individuales - Año {year}')
+
+
+def draw_risk_matrix(fig, risk_matrix, year):
+    fig.clear()
+    ax = fig.add_subplot(111)
+    if risk_matrix.empty:
+        ax.text(0.5, 0.5, f"No hay datos suficientes para generar la matriz de riesgo en {year}",
+                transform=ax.transAxes, ha="center", va="center", fontsize=16)
+    else:
+        sns.heatmap(
+            risk_matrix, annot=True, fmt='g',
+            cmap='YlOrRd', ax=ax,
+            cbar_kws={'label': 'Nivel de Riesgo'}
+        )
+        ax.set_title(f'Matriz de Riesgo - Año {year}', fontsize=16, pad=20)
+        ax.set_xlabel('Cluster Incendio Individual', fontsize=14)
+        ax.set_ylabel('Cluster Regional', fontsize=14)
+    fig.tight_layout()
+
+
+# vista -> (función de dibujo, extractor de datos desde compute_year_results, parámetros de estilo)
+VIEWS = {
+    'regional': (draw_regional_clusters, lambda results: results['regional'], ('viridis',)),
+    'individual': (draw_individual_clusters, lambda results: results['individual']['data'], ('plasma',)),
+    'matrix': (draw_risk_matrix, lambda results: results['risk_matrix'], ('YlOrRd',)),
+}
+
+
+def draw_view(fig, view, results, year):
+    """Dibuja una vista a partir de los resultados del año."""
+    draw, extract, _ = VIEWS[view]
+    draw(fig, extract(results), year)
+
+
+def tile_key(view, year, width, height):
+    """Clave de la caché de imágenes: (vista, año, tamaño en píxeles, parámetros)."""
+    return (view, year, (width, height), VIEWS[view][2] + (DPI,))
+
+
+def render_png(view, results, year, width, height):
+    """Renderiza una vista fuera de pantalla (Agg) y retorna los bytes PNG."""
+    fig = Figure(figsize=(width / DPI, height / DPI), dpi=DPI)
+    canvas = FigureCanvasAgg(fig)
+    draw_view(fig, view, results, year)
+    buffer = io.BytesIO()
+    canvas.print_png(buffer)
+    return buffer.getvalue()
+
+
+def render_pngs(tiles, results, year, rc=None):
+    """
+    Renderiza varias vistas [(vista, ancho, alto)] de un año con los rcParams rc (por ejemplo,
+    model_ui.matplotlib_style()); retorna {(vista, ancho, alto): png}.
+    """
+    with matplotlib.rc_context(rc):
+        return {(view, width, height): render_png(view, results, year, width, height)
+                for view, width, height in tiles}
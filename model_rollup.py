@@ -0,0 +1,76 @@
+# model_rollup.py
+"""
+Tabla agregada por (año, vegetación, ecosistema, causa) para los resúmenes.
+
+Los resúmenes de ecosistemas (por año e históricos), la serie de incendios por
+año y el pivote año x ecosistema solo necesitan conteos y sumas de duración.
+SummaryRollup los calcula una vez al cargar los datos sobre unas pocas cientos
+de filas agregadas, en lugar de reagrupar todos los incidentes en cada consulta,
+y memoriza cada resumen hasta que se le añaden incidentes nuevos. Con una base
+de model_sqlite, from_sqlite construye la tabla con un GROUP BY sin cargar los
+incidentes.
+"""
+import pandas as pd
+
+import model_sqlite
+from model_outofcore import accumulate_counts
+
+ROLLUP_COLS = ['Año', 'Tipo Vegetación', 'Ecosistema', 'Causa']
+
+
+def _rollup(frame):
+    return frame.groupby(ROLLUP_COLS, observed=True).agg(
+        incendios=('Año', 'count'),
+        duracion_total=('Duración días', 'sum'))
+
+
+class SummaryRollup:
+    """Conteos y suma de duración por (Año, Tipo Vegetación, Ecosistema, Causa), con resúmenes memorizados."""
+
+    def __init__(self, df, table=None):
+        self.table = _rollup(df) if table is None else table
+        self._memo = {}
+
+    @classmethod
+    def from_sqlite(cls, db_file):
+        """Tabla agregada calculada en SQL sobre la base de model_sqlite."""
+        return cls(None, table=model_sqlite.grouped_totals(db_file, ROLLUP_COLS))
+
+    def add(self, rows):
+        """Suma a la tabla un lote ya preprocesado e invalida los resúmenes memorizados."""
+        self.table = accumulate_counts(self.table, _rollup(rows))
+        self._memo = {}
+
+    def _memoized(self, key, compute):
+        result = self._memo.get(key)
+        if result is None:
+            result = self._memo[key] = compute()
+        return result.copy()
+
+    def _years(self, year):
+        """Filas de un año o, si year es None, del periodo histórico 2015-2023."""
+        years = self.table.index.get_level_values('Año')
+        rows = self.table[(years >= 2015) & (years <= 2023)] if year is None else self.table[years == year]
+        if rows.empty:
+            raise ValueError(f"No hay datos para el año {year}")
+        return rows
+
+    def ecosystem_summary(self, year=None):
+        """Mismo resultado que get_ecosystem_summary_by_year (o el histórico si year es None)."""
+        def compute():
+            totals = self._years(year).groupby(level='Tipo Vegetación').sum()
+            return pd.DataFrame({
+                'frecuencia_incendios': totals['incendios'],
+                'duracion_promedio': totals['duracion_total'] / totals['incendios']
+            }).sort_values(by='frecuencia_incendios', ascending=False).reset_index()
+        return self._memoized(('ecosystem', year), compute)
+
+    def yearly_counts(self):
+        """Incendios por año (columnas Año, Incendios)."""
+        return self._memoized('yearly', lambda: (
+            self.table.groupby(level='Año')['incendios'].sum().reset_index(name='Incendios')))
+
+    def ecosystem_by_year(self):
+        """Incendios por año y ecosistema (columnas Año, Ecosistema, Incendios)."""
+        return self._memoized('ecosystem_by_year', lambda: (
+            self.table.groupby(level=['Año', 'Ecosistema'])['incendios'].sum().reset_index(name='Incendios')))
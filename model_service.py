@@ -0,0 +1,235 @@
+# model_service.py
+"""
+Servicio HTTP/JSON local que expone los análisis de model_backend.
+
+El dataset se carga una sola vez al arrancar y se publica en memoria compartida
+(model_shared), a la que se conectan sin copias los procesos trabajadores donde
+se ejecutan los ajustes de KMeans. Con una base SQLite (--csv incendios.db) no
+se carga: cada trabajador consulta solo las filas del año o los agregados que
+necesita el análisis (ver model_sqlite). Las respuestas se guardan en una caché en
+memoria con ETags, de modo que los clientes que repiten una consulta reciben la
+respuesta sin recalcular nada.
+
+Uso:
+    python model_service.py --csv BD.csv --port 8050
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+import model_backend
+import model_shared
+import model_sqlite
+from model_cache import ResultCache
+
+
+def _frame_to_json(frame, orient='records'):
+    return frame.to_json(orient=orient, force_ascii=False)
+
+
+def _run_analysis(name, year, db_file=None):
+    """
+    Ejecuta un análisis en el proceso trabajador y devuelve el cuerpo JSON en bytes.
+    Con db_file, los datos se consultan en la base SQLite en lugar del dataset compartido.
+    """
+    df = model_shared.worker_dataset() if db_file is None else None
+    if name == 'regional':
+        reg_summary = model_backend.get_regional_summary_by_year(df, year, csv_file=db_file)
+        data = _frame_to_json(model_backend.compute_regional_clusters(reg_summary))
+    elif name == 'top10':
+        data = _frame_to_json(model_backend.get_top10_regions_by_year(df, year, csv_file=db_file))
+    elif name == 'ecosystem':
+        data = _frame_to_json(model_backend.get_ecosystem_summary_by_year(df, year, csv_file=db_file))
+    elif name == 'risk-matrix':
+        data = _frame_to_json(model_backend.compute_risk_matrix_by_year(df, year, csv_file=db_file),
+                              orient='split')
+    elif name == 'historical/top10':
+        data = _frame_to_json(model_backend.get_top10_regions_historical(db_file, df=df))
+    elif name == 'historical/ecosystem':
+        data = _frame_to_json(model_backend.get_ecosystem_summary_historical(db_file, df=df))
+    elif name == 'historical/risk-matrix':
+        data = _frame_to_json(model_backend.compute_risk_matrix_historical(db_file, df=df), orient='split')
+    else:
+        raise KeyError(name)
+    year_json = 'null' if year is None else str(year)
+    return f'{{"analysis": "{name}", "year": {year_json}, "data": {data}}}'.encode('utf-8')
+
+
+YEARLY_ANALYSES = ('regional', 'top10', 'ecosystem', 'risk-matrix')
+HISTORICAL_ANALYSES = ('historical/top10', 'historical/ecosystem', 'historical/risk-matrix')
+
+
+class AnalysisService:
+    """Servidor asyncio que atiende peticiones GET (y HEAD) y delega los cálculos al pool de procesos."""
+
+    def __init__(self, csv_file='BD.csv', max_workers=None, cache_mb=128, budget=None):
+        self.csv_file = csv_file
+        if model_sqlite.is_sqlite_file(csv_file):
+            # Los trabajadores consultan la base directamente: no hay dataset que cargar ni compartir
+            self.db_file = csv_file
+            self.df = None
+            self.years = [int(y) for y in model_sqlite.available_years(csv_file)]
+        else:
+            self.db_file = None
+            self.df = model_backend.load_and_process_data(csv_file)
+            self.years = sorted(int(y) for y in self.df['Año'].unique())
+        self.max_workers = max_workers
+        self.pool = None
+        self.shared = None
+        # clave -> (etag, cuerpo), acotada en bytes y desalojada según el costo de recalcular
+        self._cache = ResultCache(max_bytes=cache_mb * 1024 * 1024, budget=budget, name='servicio')
+        # clave -> tarea compartida por las peticiones concurrentes de un mismo resultado
+        self._pending = {}
+
+    def _route(self, path):
+        """Traduce la ruta a (análisis, año) o lanza KeyError si no existe."""
+        parts = [p for p in path.split('/') if p]
+        if len(parts) == 2 and parts[0] in YEARLY_ANALYSES:
+            if not parts[1].isdigit():
+                raise ValueError(f"Año inválido: {parts[1]}")
+            year = int(parts[1])
+            if year not in self.years:
+                raise ValueError(f"No hay datos para el año {year}")
+            return parts[0], year
+        if len(parts) == 2 and '/'.join(parts) in HISTORICAL_ANALYSES:
+            return '/'.join(parts), None
+        raise KeyError(path)
+
+    async def _compute(self, key):
+        name, year = key
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        body = await loop.run_in_executor(self.pool, _run_analysis, name, year, self.db_file)
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        self._cache.put(key, (etag, body), cost=time.perf_counter() - start)
+        return etag, body
+
+    async def get_result(self, name, year):
+        """Retorna (etag, cuerpo) desde la caché o calculándolo una sola vez en el pool."""
+        key = (name, year)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(key))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        # shield: si un cliente se desconecta, el cálculo sigue para los demás
+        return await asyncio.shield(task)
+
+    async def handle_request(self, method, target, headers):
+        """
+        Retorna (estado, cabeceras extra, cuerpo) para una petición ya parseada.
+        HEAD se responde igual que GET; handle_connection omite el cuerpo al escribirla.
+        """
+        if method not in ('GET', 'HEAD'):
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'Allow': 'GET, HEAD'}, _error_body('Método no permitido')
+        path = urlsplit(target).path
+        if path == '/health':
+            return HTTPStatus.OK, {}, b'{"status": "ok"}'
+        if path == '/years':
+            return HTTPStatus.OK, {}, json.dumps({'years': self.years}).encode('utf-8')
+        try:
+            name, year = self._route(path)
+        except (KeyError, ValueError) as e:
+            message = str(e) if isinstance(e, ValueError) else 'Ruta no encontrada'
+            return HTTPStatus.NOT_FOUND, {}, _error_body(message)
+        try:
+            etag, body = await self.get_result(name, year)
+        except ValueError as e:
+            return HTTPStatus.NOT_FOUND, {}, _error_body(str(e))
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {}, _error_body(f"Error en el análisis: {e}")
+        extra = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag in _parse_etags(headers.get('if-none-match', '')):
+            return HTTPStatus.NOT_MODIFIED, extra, b''
+        return HTTPStatus.OK, extra, body
+
+    async def handle_connection(self, reader, writer):
+        """Atiende una conexión HTTP/1.1 con keep-alive."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin1').split()
+                except ValueError:
+                    await _write_response(writer, HTTPStatus.BAD_REQUEST, {}, _error_body('Petición inválida'), False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close')
+                status, extra, body = await self.handle_request(method, target, headers)
+                await _write_response(writer, status, extra, body, keep_alive, head=(method == 'HEAD'))
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8050):
+        if self.db_file is None:
+            self.shared = model_shared.SharedDataset(self.df)
+            self.pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                            initializer=model_shared.init_worker,
+                                            initargs=(self.shared.descriptor,))
+        else:
+            self.pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        # Arrancar los procesos antes de aceptar conexiones: un trabajador creado con fork mientras
+        # hay una conexión abierta hereda su socket y el cliente no recibe el cierre de la conexión
+        await asyncio.get_running_loop().run_in_executor(self.pool, os.getpid)
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Servicio de análisis escuchando en http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+            if self.shared is not None:
+                self.shared.close()
+
+
+def _error_body(message):
+    return json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+
+
+def _parse_etags(value):
+    return {tag.strip() for tag in value.split(',') if tag.strip()}
+
+
+async def _write_response(writer, status, extra_headers, body, keep_alive, head=False):
+    """Escribe la respuesta; con head=True envía las cabeceras (Content-Length incluido) sin el cuerpo."""
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+    headers = {'Content-Type': 'application/json; charset=utf-8',
+               'Content-Length': str(len(body)),
+               'Connection': 'keep-alive' if keep_alive else 'close'}
+    headers.update(extra_headers)
+    lines.extend(f"{k}: {v}" for k, v in headers.items())
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin1') + (b'' if head else body))
+    await writer.drain()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON de análisis de incendios")
+    parser.add_argument('--csv', default='BD.csv')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8050)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache-mb', type=int, default=128)
+    args = parser.parse_args()
+    service = AnalysisService(args.csv, max_workers=args.workers, cache_mb=args.cache_mb)
+    asyncio.run(service.serve(args.host, args.port))
@@ -0,0 +1,115 @@
+# model_shared.py
+"""
+Dataset en memoria compartida para procesos trabajadores.
+
+SharedDataset copia una sola vez cada columna del DataFrame cargado a un bloque
+de multiprocessing.shared_memory: las columnas numéricas como arreglos tal cual
+y las de texto como códigos de categoría (las categorías viajan en el
+descriptor, que es pequeño y se puede serializar). Los trabajadores reconstruyen
+el DataFrame con attach(descriptor) sobre esos mismos bloques, sin copiar los
+datos, de modo que repartir trabajo entre procesos no cuesta una copia del
+dataset por trabajador.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Dataset del proceso trabajador y los bloques que lo respaldan (deben seguir abiertos)
+_worker_df = None
+_worker_blocks = []
+
+
+def _to_shared(values):
+    block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+    return block
+
+
+class SharedDataset:
+    """Publica un DataFrame en memoria compartida; usar close() (o with) para liberarla."""
+
+    def __init__(self, df):
+        self._blocks = []
+        columns = []
+        arrays = [('__index__', df.index.to_numpy(), None)]
+        for name in df.columns:
+            series = df[name]
+            if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+                arrays.append((name, series.to_numpy(), None))
+            else:
+                categorical = pd.Categorical(series)
+                arrays.append((name, categorical.codes, list(categorical.categories)))
+        for name, values, categories in arrays:
+            block = _to_shared(np.ascontiguousarray(values))
+            self._blocks.append(block)
+            columns.append({'name': name, 'block': block.name, 'dtype': values.dtype.str,
+                            'categories': categories})
+        self.descriptor = {'n_rows': len(df), 'columns': columns}
+
+    @property
+    def nbytes(self):
+        return sum(block.size for block in self._blocks)
+
+    def close(self):
+        """Libera los bloques de memoria compartida (solo en el proceso que los creó)."""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach(descriptor):
+    """
+    Reconstruye el DataFrame a partir del descriptor sin copiar los datos.
+    Retorna (df, bloques); los bloques deben mantenerse abiertos mientras se use df.
+    """
+    n_rows = descriptor['n_rows']
+    blocks = []
+    data = {}
+    index = None
+    for column in descriptor['columns']:
+        block = shared_memory.SharedMemory(name=column['block'])
+        blocks.append(block)
+        values = np.ndarray((n_rows,), dtype=np.dtype(column['dtype']), buffer=block.buf)
+        values.flags.writeable = False
+        if column['name'] == '__index__':
+            index = pd.Index(values, copy=False)
+        elif column['categories'] is not None:
+            data[column['name']] = pd.Categorical.from_codes(values, column['categories'], validate=False)
+        else:
+            data[column['name']] = values
+    return pd.DataFrame(data, index=index, copy=False), blocks
+
+
+def init_worker(descriptor):
+    """Inicializador de ProcessPoolExecutor: conecta el trabajador al dataset compartido."""
+    global _worker_df, _worker_blocks
+    _worker_df, _worker_blocks = attach(descriptor)
+
+
+def worker_dataset():
+    """Retorna el dataset conectado por init_worker en este proceso."""
+    return _worker_df
+
+
+def _call_with_dataset(func, arg):
+    return func(_worker_df, arg)
+
+
+def map_years(func, shared, years, max_workers=None):
+    """
+    Ejecuta func(df, año) para cada año en un pool de procesos conectados al dataset
+    compartido. func debe ser una función de módulo (serializable). Retorna {año: resultado}.
+    """
+    years = list(years)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker,
+                             initargs=(shared.descriptor,)) as pool:
+        return dict(zip(years, pool.map(_call_with_dataset, [func] * len(years), years)))
@@ -0,0 +1,87 @@
+# model_spatial.py
+"""
+Índice espacial de cubetas (grid) para consultar los puntos visibles de un mapa.
+
+GridIndex ordena los puntos por cubeta de cell_size grados (fila de latitud,
+columna de longitud). Los puntos de una misma fila de cubetas quedan contiguos,
+así que una ventana rectangular se resuelve con dos búsquedas binarias por fila
+de cubetas y un filtro exacto sobre los candidatos: el costo depende de los
+puntos visibles y no del total del año. La interfaz lo usa para redibujar solo
+lo que cae dentro de los límites de los ejes al hacer zoom o desplazarse.
+"""
+import numpy as np
+import pandas as pd
+
+# Tope de puntos a dibujar por ventana; por encima se toma una muestra regular
+MAX_VISIBLE_POINTS = 20000
+
+
+class GridIndex:
+    """Índice de puntos (latitud, longitud) por cubetas de cell_size grados."""
+
+    def __init__(self, lat, lon, cell_size=0.5):
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        self.cell_size = cell_size
+        self.lat0 = lat.min() if len(lat) else 0.0
+        self.lon0 = lon.min() if len(lon) else 0.0
+        rows = self._row(lat)
+        cols = self._col(lon)
+        self.n_cols = int(cols.max()) + 1 if len(cols) else 1
+        self.n_rows = int(rows.max()) + 1 if len(rows) else 1
+        keys = rows * self.n_cols + cols
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+        self.lat = lat[self.order]
+        self.lon = lon[self.order]
+
+    def _row(self, lat):
+        return np.floor((lat - self.lat0) / self.cell_size).astype(np.int64)
+
+    def _col(self, lon):
+        return np.floor((lon - self.lon0) / self.cell_size).astype(np.int64)
+
+    def __len__(self):
+        return len(self.order)
+
+    def query(self, lat_min, lat_max, lon_min, lon_max):
+        """Retorna las posiciones (en el orden original) de los puntos dentro de la ventana."""
+        row_lo = max(int(self._row(lat_min)), 0)
+        row_hi = min(int(self._row(lat_max)), self.n_rows - 1)
+        col_lo = max(int(self._col(lon_min)), 0)
+        col_hi = min(int(self._col(lon_max)), self.n_cols - 1)
+        if row_lo > row_hi or col_lo > col_hi:
+            return np.empty(0, dtype=np.int64)
+        # Rango contiguo de claves por cada fila de cubetas
+        rows = np.arange(row_lo, row_hi + 1)
+        starts = np.searchsorted(self.keys, rows * self.n_cols + col_lo, side='left')
+        stops = np.searchsorted(self.keys, rows * self.n_cols + col_hi, side='right')
+        candidates = np.concatenate([np.arange(a, b) for a, b in zip(starts, stops)])
+        # Filtro exacto: las cubetas del borde pueden quedar parcialmente fuera
+        inside = ((self.lat[candidates] >= lat_min) & (self.lat[candidates] <= lat_max)
+                  & (self.lon[candidates] >= lon_min) & (self.lon[candidates] <= lon_max))
+        return np.sort(self.order[candidates[inside]])
+
+
+def sample_positions(positions, max_points=MAX_VISIBLE_POINTS):
+    """Si hay más de max_points posiciones, retorna una muestra regular de ese tamaño."""
+    if len(positions) <= max_points:
+        return positions
+    return positions[np.linspace(0, len(positions) - 1, max_points).astype(np.int64)]
+
+
+def viewport_summary(visible, cluster_col, duration_col, weight_col=None):
+    """
+    Estadísticas de los puntos visibles: puntos, incendios (suma de weight_col si los puntos
+    son celdas agregadas), duración media ponderada y clúster predominante.
+    """
+    if visible.empty:
+        return {'puntos': 0, 'incendios': 0, 'duracion_media': float('nan'), 'cluster_predominante': None}
+    weights = visible[weight_col] if weight_col is not None else pd.Series(1, index=visible.index)
+    by_cluster = weights.groupby(visible[cluster_col]).sum()
+    return {
+        'puntos': len(visible),
+        'incendios': int(weights.sum()),
+        'duracion_media': float(np.average(visible[duration_col], weights=weights)),
+        'cluster_predominante': by_cluster.idxmax(),
+    }
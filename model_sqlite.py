@@ -0,0 +1,185 @@
+# model_sqlite.py
+"""
+Almacén SQLite opcional de incidentes, alternativo a BD.csv.
+
+import_csv copia el CSV a una tabla `incidentes` (con las columnas que añade
+load_and_process_data) e índices por año y celda, por celda y por vegetación.
+Las consultas por año, por rango de años o por zona filtran en SQL, y los
+agregados por celda y por vegetación se calculan con GROUP BY en SQLite, así
+que a pandas solo llegan las filas o los grupos necesarios.
+
+load_and_process_data acepta directamente un archivo .db/.sqlite, y
+iter_incidents recorre la tabla por bloques para el análisis histórico
+out-of-core. Las funciones por año de model_backend, con df=None y la base como
+csv_file, leen solo las filas del año (load_incidents) o agregan en SQL
+(regional_summary, ecosystem_summary); así trabajan la interfaz y el servicio
+cuando reciben una base:
+    results = compute_year_results(None, 2020, csv_file='incendios.db')
+
+Uso:
+    python model_sqlite.py BD.csv incendios.db
+"""
+import argparse
+import os
+import sqlite3
+from contextlib import closing
+
+import pandas as pd
+
+TABLE = 'incidentes'
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+INDEXES = {
+    'idx_anio_celda': ['Año', 'Latitud_round', 'Longitud_round', 'Tipo Vegetación'],
+    'idx_celda': ['Latitud_round', 'Longitud_round'],
+    'idx_vegetacion': ['Tipo Vegetación'],
+}
+
+
+def is_sqlite_file(path):
+    return str(path).lower().endswith(SQLITE_EXTENSIONS)
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def import_csv(csv_file='BD.csv', db_file='incendios.db', chunksize=100_000):
+    """
+    Crea (o reemplaza) la tabla de incidentes a partir del CSV, por bloques, con el mismo
+    preprocesamiento que load_and_process_data. Retorna el número de filas importadas.
+    """
+    n_rows = 0
+    with closing(sqlite3.connect(db_file)) as conn:
+        conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        for chunk in pd.read_csv(csv_file, encoding='latin1', chunksize=chunksize):
+            chunk = chunk.dropna()
+            chunk['Latitud_round'] = chunk['Latitud'].round(1)
+            chunk['Longitud_round'] = chunk['Longitud'].round(1)
+            chunk.to_sql(TABLE, conn, if_exists='append', index=False)
+            n_rows += len(chunk)
+        for name, columns in INDEXES.items():
+            conn.execute(f"CREATE INDEX {name} ON {TABLE} ({', '.join(map(_quote, columns))})")
+        conn.execute("ANALYZE")
+        conn.commit()
+    return n_rows
+
+
+def _where(year=None, years=None, bbox=None):
+    """Cláusula WHERE y parámetros para un año, un rango (inicio, fin) y/o una zona de celdas."""
+    clauses, params = [], []
+    if year is not None:
+        clauses.append('"Año" = ?')
+        params.append(int(year))
+    if years is not None:
+        clauses.append('"Año" BETWEEN ? AND ?')
+        params.extend(int(y) for y in years)
+    if bbox is not None:
+        # bbox = (lat_min, lat_max, lon_min, lon_max) sobre las celdas redondeadas
+        clauses.append('"Latitud_round" BETWEEN ? AND ? AND "Longitud_round" BETWEEN ? AND ?')
+        params.extend(float(v) for v in bbox)
+    return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+
+def _query(db_file, sql, params=()):
+    if not os.path.exists(db_file):
+        raise FileNotFoundError(db_file)
+    with closing(sqlite3.connect(db_file)) as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+
+def load_incidents(db_file, year=None, years=None, bbox=None):
+    """Incidentes que cumplen los filtros, con el mismo formato que load_and_process_data."""
+    where, params = _where(year, years, bbox)
+    df = _query(db_file, f"SELECT * FROM {TABLE}{where} ORDER BY rowid", params)
+    if df.empty and year is not None:
+        raise ValueError(f"No hay datos para el año {year}")
+    return df
+
+
+def grouped_totals(db_file, columns):
+    """
+    Conteo de incidentes y suma de duración por las columnas indicadas, calculados en SQL e
+    indexados por ellas (mismo formato que la tabla de model_rollup.SummaryRollup).
+    """
+    keys = ', '.join(map(_quote, columns))
+    table = _query(db_file, f"""
+        SELECT {keys}, COUNT(*) AS incendios, SUM("Duración días") AS duracion_total
+        FROM {TABLE}
+        GROUP BY {keys}
+        ORDER BY {keys}
+    """)
+    return table.set_index(columns)
+
+
+def iter_incidents(db_file, chunksize=100_000, year=None, years=None, bbox=None):
+    """Recorre los incidentes que cumplen los filtros en bloques de chunksize filas (DataFrames)."""
+    if not os.path.exists(db_file):
+        raise FileNotFoundError(db_file)
+    where, params = _where(year, years, bbox)
+    with closing(sqlite3.connect(db_file)) as conn:
+        yield from pd.read_sql_query(f"SELECT * FROM {TABLE}{where} ORDER BY rowid", conn,
+                                     params=params, chunksize=chunksize)
+
+
+def available_years(db_file):
+    return _query(db_file, f'SELECT DISTINCT "Año" FROM {TABLE} ORDER BY "Año"')['Año'].tolist()
+
+
+def regional_summary(db_file, year=None, years=(2015, 2023)):
+    """
+    Resumen por celda (mismo formato que get_regional_summary_by_year) calculado en SQL.
+    La vegetación predominante es la más frecuente de la celda y, en empate, la menor,
+    igual que Series.mode()[0]. Sin year, usa el rango years.
+    """
+    where, params = _where(year=year, years=None if year is not None else years)
+    sql = f"""
+        WITH celdas AS (
+            SELECT "Latitud_round", "Longitud_round",
+                   COUNT(*) AS frecuencia_incendios, AVG("Duración días") AS duracion_promedio
+            FROM {TABLE}{where}
+            GROUP BY "Latitud_round", "Longitud_round"
+        ), vegetacion AS (
+            SELECT "Latitud_round", "Longitud_round", "Tipo Vegetación", COUNT(*) AS n
+            FROM {TABLE}{where}
+            GROUP BY "Latitud_round", "Longitud_round", "Tipo Vegetación"
+        ), moda AS (
+            SELECT "Latitud_round", "Longitud_round", "Tipo Vegetación",
+                   ROW_NUMBER() OVER (PARTITION BY "Latitud_round", "Longitud_round"
+                                      ORDER BY n DESC, "Tipo Vegetación") AS orden
+            FROM vegetacion
+        )
+        SELECT c."Latitud_round", c."Longitud_round", c.frecuencia_incendios, c.duracion_promedio,
+               m."Tipo Vegetación" AS vegetacion_predominante
+        FROM celdas c JOIN moda m
+          ON m."Latitud_round" = c."Latitud_round" AND m."Longitud_round" = c."Longitud_round" AND m.orden = 1
+        ORDER BY c."Latitud_round", c."Longitud_round"
+    """
+    summary = _query(db_file, sql, params * 2)
+    if summary.empty:
+        raise ValueError(f"No hay datos para el año {year}")
+    return summary
+
+
+def ecosystem_summary(db_file, year=None, years=(2015, 2023)):
+    """Resumen por tipo de vegetación (mismo formato que get_ecosystem_summary_by_year) calculado en SQL."""
+    where, params = _where(year=year, years=None if year is not None else years)
+    summary = _query(db_file, f"""
+        SELECT "Tipo Vegetación", COUNT(*) AS frecuencia_incendios, AVG("Duración días") AS duracion_promedio
+        FROM {TABLE}{where}
+        GROUP BY "Tipo Vegetación"
+        ORDER BY "Tipo Vegetación"
+    """, params)
+    if summary.empty:
+        raise ValueError(f"No hay datos para el año {year}")
+    # Ordenar en pandas para que los empates queden igual que en model_backend
+    return summary.sort_values(by='frecuencia_incendios', ascending=False).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa BD.csv a una base SQLite indexada")
+    parser.add_argument('csv_file', nargs='?', default='BD.csv')
+    parser.add_argument('db_file', nargs='?', default='incendios.db')
+    args = parser.parse_args()
+    n_rows = import_csv(args.csv_file, args.db_file)
+    print(f"Importados {n_rows} incidentes en {args.db_file}")
@@ -0,0 +1,136 @@
+# model_store.py
+"""
+Almacén de incidentes particionado por año con anexado incremental.
+
+Permite ingerir lotes de incidentes nuevos sin reescribir BD.csv ni volver a
+llamar a load_and_process_data: cada lote se añade a la partición de su año,
+se actualizan en sitio los agregados por celda de ese año y solo los años
+afectados quedan marcados como pendientes de reajuste. Opcionalmente, los
+centroides del clúster individual ya ajustado se refrescan con una
+actualización incremental (estilo partial_fit) usando solo las filas nuevas.
+"""
+import numpy as np
+import pandas as pd
+
+from model_backend import load_and_process_data, build_individual_pipeline
+from model_outofcore import accumulate_counts, mode_from_counts
+from model_rollup import SummaryRollup
+
+CELL_COLS = ['Latitud_round', 'Longitud_round']
+
+
+def prepare_rows(rows):
+    """Aplica a un lote nuevo el mismo preprocesamiento que load_and_process_data."""
+    rows = pd.DataFrame(rows).dropna().copy()
+    rows['Latitud_round'] = rows['Latitud'].round(1)
+    rows['Longitud_round'] = rows['Longitud'].round(1)
+    return rows
+
+
+def _cell_stats(frame):
+    return frame.groupby(CELL_COLS + ['Tipo Vegetación']).agg(
+        n=('Año', 'count'), dur=('Duración días', 'sum'))
+
+
+class IncidentStore:
+    """Dataset de incidentes particionado por año, con agregados y modelos por año."""
+
+    def __init__(self, df):
+        # año -> lista de bloques; se consolidan en un único DataFrame al leer el año
+        self._chunks = {}
+        # año -> conteos y suma de duración por (celda, vegetación)
+        self.cell_stats = {}
+        # año -> {'pipeline': Pipeline ajustado, 'counts': incidentes por centroide}
+        self.models = {}
+        self.dirty_years = set()
+        # Conteos por (año, vegetación, ecosistema, causa) para los resúmenes
+        self.rollup = SummaryRollup(df)
+        for year, frame in df.groupby('Año'):
+            self._chunks[year] = [frame]
+            self.cell_stats[year] = _cell_stats(frame)
+
+    @classmethod
+    def from_csv(cls, csv_file='BD.csv'):
+        return cls(load_and_process_data(csv_file))
+
+    @property
+    def years(self):
+        return sorted(self._chunks)
+
+    @property
+    def df(self):
+        """Dataset completo, con el mismo formato que load_and_process_data."""
+        return pd.concat([self.year_frame(year) for year in self.years])
+
+    def year_frame(self, year):
+        """Retorna la partición de un año, consolidando los lotes anexados."""
+        chunks = self._chunks.get(year)
+        if not chunks:
+            raise ValueError(f"No hay datos para el año {year}")
+        if len(chunks) > 1:
+            chunks[:] = [pd.concat(chunks)]
+        return chunks[0]
+
+    def append(self, rows, refresh_centroids=False):
+        """
+        Ingiere un lote de incidentes nuevos. El costo es proporcional al lote:
+        solo se tocan las particiones, agregados y modelos de los años presentes en él.
+        Retorna el conjunto de años afectados.
+        """
+        rows = prepare_rows(rows)
+        self.rollup.add(rows)
+        affected = set()
+        for year, batch in rows.groupby('Año'):
+            self._chunks.setdefault(year, []).append(batch)
+            self.cell_stats[year] = accumulate_counts(self.cell_stats.get(year), _cell_stats(batch))
+            if refresh_centroids and year in self.models:
+                self._refresh_centroids(year, batch)
+            affected.add(year)
+        self.dirty_years |= affected
+        return affected
+
+    def regional_summary(self, year):
+        """Resumen regional del año (mismo formato que get_regional_summary_by_year) desde los agregados."""
+        stats = self.cell_stats.get(year)
+        if stats is None:
+            raise ValueError(f"No hay datos para el año {year}")
+        totals = stats.groupby(level=CELL_COLS).sum()
+        return pd.DataFrame({
+            'frecuencia_incendios': totals['n'],
+            'duracion_promedio': totals['dur'] / totals['n'],
+            'vegetacion_predominante': mode_from_counts(stats['n'], CELL_COLS, 'Tipo Vegetación')
+        }).reset_index()
+
+    def fit_year(self, year):
+        """Ajusta (o reajusta) el clúster individual del año y lo marca como actualizado."""
+        frame = self.year_frame(year)
+        pipeline = build_individual_pipeline()
+        labels = pipeline.fit_predict(frame)
+        n_clusters = pipeline.named_steps['kmeans'].n_clusters
+        self.models[year] = {'pipeline': pipeline, 'counts': np.bincount(labels, minlength=n_clusters)}
+        self.dirty_years.discard(year)
+        return labels
+
+    def pop_dirty_years(self):
+        """Retorna y limpia los años pendientes de reajuste (para invalidar cachés)."""
+        dirty, self.dirty_years = self.dirty_years, set()
+        return dirty
+
+    def _refresh_centroids(self, year, batch):
+        """
+        Actualiza los centroides con las filas nuevas como en un paso de MiniBatchKMeans.partial_fit:
+        cada centroide se mueve hacia la media de sus puntos nuevos, ponderado por los incidentes
+        que ya tenía asignados. El preprocesador (escala y categorías) no se modifica.
+        """
+        model = self.models[year]
+        pipeline = model['pipeline']
+        kmeans = pipeline.named_steps['kmeans']
+        X = pipeline.named_steps['preprocessor'].transform(batch)
+        labels = kmeans.predict(X)
+        centers = kmeans.cluster_centers_
+        for k in np.unique(labels):
+            mask = labels == k
+            n_new = int(mask.sum())
+            model['counts'][k] += n_new
+            batch_sum = np.asarray(X[mask].sum(axis=0)).ravel()
+            centers[k] += (batch_sum - n_new * centers[k]) / model['counts'][k]
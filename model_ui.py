@@ -1,47 +1,164 @@
+import base64
+import importlib
+import multiprocessing
+import queue
+import threading
+import time
 import tkinter as tk
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from tkinter import ttk, messagebox, scrolledtext
-import model_backend as model_backend
-import matplotlib.pyplot as plt
-import seaborn as sns
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-import pandas as pd
-from datetime import datetime
-import numpy as np
+
+class _LazyModule:
+    """Importa el módulo la primera vez que se accede a uno de sus atributos."""
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+    
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+# Las librerías pesadas (pandas, sklearn, seaborn, matplotlib) se importan al primer uso
+# para que la ventana aparezca sin esperar a que terminen de cargarse
+model_backend = _LazyModule('model_backend')
+model_cache = _LazyModule('model_cache')
+model_memory = _LazyModule('model_memory')
+model_rollup = _LazyModule('model_rollup')
+model_spatial = _LazyModule('model_spatial')
+model_sqlite = _LazyModule('model_sqlite')
+model_render = _LazyModule('model_render')
+plt = _LazyModule('matplotlib.pyplot')
+sns = _LazyModule('seaborn')
+np = _LazyModule('numpy')
+mpl_figure = _LazyModule('matplotlib.figure')
+backend_tkagg = _LazyModule('matplotlib.backends.backend_tkagg')
+
+# Vistas de mapa: tienen barra de navegación (zoom/desplazamiento) y redibujan solo la zona visible
+MAP_VIEWS = ("regional", "individual")
+
+# Mensajes de la ventana histórica para cada etapa de historical_analysis_progressive
+HISTORICAL_STAGES = {
+    "inicio": "Calculando resúmenes...",
+    "resumen": "Resúmenes listos; calculando clústeres preliminares...",
+    "preliminar": "Clústeres preliminares (ajuste rápido sobre una muestra); refinando...",
+    "final": "Análisis completo",
+}
 
 class WildfireAnalysisApp:
-    def __init__(self, root):
+    def __init__(self, root, csv_file='BD.csv', result_cache_mb=256, tile_cache_mb=64, memory_budget_mb=384):
         self.root = root
         self.root.title("Análisis de Incendios")
         self.root.geometry("1200x800")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # Variables
         self.current_year = tk.IntVar(value=2015)
         self.min_year = 2015
         self.max_year = 2023
+        self.csv_file = csv_file
+        # Incidentes cargados (None con una base SQLite: cada año se consulta al necesitarlo)
         self.df = None
+        # Conteos agregados por (año, vegetación, ecosistema, causa) para los resúmenes
+        self.rollup = None
+        self.result_cache_mb = result_cache_mb
+        # Presupuesto total compartido por las cachés de resultados, imágenes e histórico
+        self.memory_budget_mb = memory_budget_mb
+        self.memory_budget = None
+        # Refresco periódico del uso de memoria en la barra de estado (id de root.after)
+        self.memory_after = None
+        self.historical_cache = None
+        # Análisis histórico progresivo en curso ({'stages': [(etapa, resultados)], 'error': ...});
+        # las ventanas que se abren mientras corre se enganchan a él en lugar de lanzar otro
+        self.historical_run = None
+        # Resultados por año (se crea al terminar la carga, cuando pandas ya está importado)
+        self.year_cache = None
+        # Imágenes PNG prerrenderizadas por (vista, año, tamaño, parámetros)
+        self.tile_cache_mb = tile_cache_mb
+        self.tile_cache = None
+        self.render_future = None
+        self.render_years = ()
+        # Las imágenes se renderizan en otro proceso: matplotlib no es seguro entre hilos
+        # y el hilo de Tk dibuja las figuras en vivo al mismo tiempo
+        self.render_executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        # Precálculo especulativo de los años vecinos en un hilo de fondo
+        self.prefetch_executor = ThreadPoolExecutor(max_workers=1)
+        self.prefetch_futures = {}
+        self.prefetch_targets = frozenset()
         self.canvases = {}
         self.tabs = {}
+        # Pestañas cuyo contenido no corresponde al año actual (se recalculan al seleccionarlas)
+        self.stale_tabs = set()
         
         # Configurar estilo
         self.setup_styles()
         
-        # Load data
-        try:
-            self.df = model_backend.load_and_process_data('BD.csv')
-            print("Datos cargados correctamente")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al cargar datos: {str(e)}")
-            return
-        
         # Create main frames
         self.create_main_layout()
         self.create_year_selector()
         self.create_tabs()
         
-        # Initial update
+        # Load data in background; the initial update runs when it finishes
+        self.set_navigation_state(tk.DISABLED)
+        self.start_data_load()
+    
+    def start_data_load(self):
+        """Carga el CSV en un hilo para que la ventana se muestre de inmediato"""
+        self.status_var.set("Cargando datos...")
+        self.load_queue = queue.Queue()
+        threading.Thread(target=self._load_data_worker, daemon=True).start()
+        self.root.after(50, self._poll_data_load)
+    
+    def _load_data_worker(self):
+        try:
+            if model_sqlite.is_sqlite_file(self.csv_file):
+                # Con una base SQLite no se carga el histórico: la tabla agregada sale de un GROUP BY
+                # y cada año (o el periodo histórico) se consulta al necesitarlo
+                df, rollup = None, model_rollup.SummaryRollup.from_sqlite(self.csv_file)
+            else:
+                df = model_backend.load_and_process_data(self.csv_file)
+                rollup = model_rollup.SummaryRollup(df)
+            self.load_queue.put(("ok", (df, rollup)))
+            # Adelantar la importación de seaborn/matplotlib mientras el usuario ve la ventana
+            importlib.import_module('seaborn')
+        except Exception as e:
+            self.load_queue.put(("error", e))
+    
+    def _poll_data_load(self):
+        """Revisa desde el hilo de Tk si la carga en segundo plano terminó"""
+        try:
+            status, payload = self.load_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(50, self._poll_data_load)
+            return
+        if status == "error":
+            self.status_var.set("Error al cargar datos")
+            messagebox.showerror("Error", f"Error al cargar datos: {str(payload)}")
+            return
+        self.df, self.rollup = payload
+        mb = 1024 * 1024
+        self.memory_budget = model_memory.MemoryBudget(max_bytes=self.memory_budget_mb * mb)
+        self.year_cache = model_cache.ResultCache(max_bytes=self.result_cache_mb * mb,
+                                                  budget=self.memory_budget, name="resultados")
+        self.tile_cache = model_cache.ResultCache(max_bytes=self.tile_cache_mb * mb,
+                                                  budget=self.memory_budget, name="imágenes")
+        self.historical_cache = model_cache.ResultCache(max_bytes=self.memory_budget_mb * mb,
+                                                        budget=self.memory_budget, name="histórico")
+        self.update_memory_status()
+        print("Datos cargados correctamente")
+        self.set_navigation_state(tk.NORMAL)
         self.update_all_visualizations()
     
+    def update_memory_status(self):
+        """Muestra el uso de las cachés en la barra de estado (se refresca cada segundo)"""
+        self.memory_var.set(model_memory.format_usage(self.memory_budget))
+        self.memory_after = self.root.after(1000, self.update_memory_status)
+    
+    def set_navigation_state(self, state):
+        """Habilita o deshabilita los controles que necesitan los datos cargados"""
+        for button in [self.prev_btn, self.next_btn] + self.hist_buttons:
+            button.configure(state=state)
+    
     def setup_styles(self):
         style = ttk.Style()
         # Configurar estilo para botones de año
@@ -67,6 +184,10 @@ class WildfireAnalysisApp:
         self.status_var = tk.StringVar(value="Listo")
         self.status_bar = ttk.Label(self.root, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        # Uso de memoria de las cachés, a la derecha de la barra de estado
+        self.memory_var = tk.StringVar(value="")
+        ttk.Label(self.status_bar, textvariable=self.memory_var).pack(side=tk.RIGHT, padx=5)
     
     def create_year_selector(self):
         # Year selector frame
@@ -118,23 +239,15 @@ class WildfireAnalysisApp:
         hist_frame = ttk.LabelFrame(self.left_frame, text="Análisis Histórico (2015-2023)", padding="10")
         hist_frame.pack(fill=tk.X, pady=10)
         
-        ttk.Button(
-            hist_frame, 
-            text="Ver Análisis Histórico Completo",
-            command=self.show_historical_analysis
-        ).pack(fill=tk.X, pady=5)
-        
-        ttk.Button(
-            hist_frame, 
-            text="Matriz de Riesgo Histórica",
-            command=self.show_historical_risk_matrix
-        ).pack(fill=tk.X, pady=5)
-        
-        ttk.Button(
-            hist_frame, 
-            text="Resumen de Datos Históricos",
-            command=self.show_historical_summary
-        ).pack(fill=tk.X, pady=5)
+        self.hist_buttons = []
+        for text, command in [
+            ("Ver Análisis Histórico Completo", self.show_historical_analysis),
+            ("Matriz de Riesgo Histórica", self.show_historical_risk_matrix),
+            ("Resumen de Datos Históricos", self.show_historical_summary),
+        ]:
+            button = ttk.Button(hist_frame, text=text, command=command)
+            button.pack(fill=tk.X, pady=5)
+            self.hist_buttons.append(button)
         
         # Sección para leyendas de clusters con scrollbars
         self.legend_frame = ttk.LabelFrame(self.left_frame, text="Leyendas", padding="10")
@@ -202,6 +315,9 @@ class WildfireAnalysisApp:
         self.notebook.add(self.tabs["matrix"], text="Matriz de Riesgo")
         self.notebook.add(self.tabs["summary"], text="Resumen")
         
+        # Las pestañas no visibles se calculan cuando el usuario las selecciona
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        
         # Setup clusters tab with VERTICAL layout and scrollbars
         clusters_frame = ttk.Frame(self.tabs["clusters"])
         clusters_frame.pack(fill=tk.BOTH, expand=True)
@@ -279,77 +395,299 @@ class WildfireAnalysisApp:
         self.matrix_canvas.configure(scrollregion=self.matrix_canvas.bbox("all"))
     
     def create_canvas_placeholder(self, parent, width=800, height=600):
-        """Crea un placeholder para el canvas con tamaño fijo"""
+        """Crea un placeholder de tamaño fijo; la figura se crea la primera vez que se dibuja"""
         # Crear un frame contenedor con padding
         container_frame = ttk.Frame(parent, padding=10, width=width, height=height)
         container_frame.pack(padx=5, pady=5)
         container_frame.pack_propagate(False)  # Mantener el tamaño fijo
         
-        # Crear la figura con tamaño fijo
-        fig = Figure(figsize=(width/100, height/100), dpi=100)
-        
-        # Crear el canvas
-        canvas = FigureCanvasTkAgg(fig, master=container_frame)
-        
-        # Empaquetar el widget del canvas
-        canvas_widget = canvas.get_tk_widget()
+        return {"figure": None, "canvas": None, "frame": container_frame, "width": width, "height": height,
+                "tile_label": None, "photo": None, "view_year": None,
+                "live_widgets": [], "viewport": None, "viewport_after": None}
+    
+    def get_canvas(self, name):
+        """Retorna el placeholder con su figura y canvas, creándolos al primer uso"""
+        placeholder = self.canvases[name]
+        if placeholder["figure"] is None:
+            # Crear la figura con tamaño fijo
+            fig = mpl_figure.Figure(figsize=(placeholder["width"]/100, placeholder["height"]/100), dpi=100)
+            
+            # Crear el canvas
+            canvas = backend_tkagg.FigureCanvasTkAgg(fig, master=placeholder["frame"])
+            
+            # Los mapas llevan debajo la barra de zoom y las estadísticas de la zona visible
+            if name in MAP_VIEWS:
+                placeholder["stats_var"] = tk.StringVar(value="")
+                stats_label = ttk.Label(placeholder["frame"], textvariable=placeholder["stats_var"], anchor=tk.W)
+                toolbar = backend_tkagg.NavigationToolbar2Tk(canvas, placeholder["frame"], pack_toolbar=False)
+                toolbar.update()
+                placeholder["live_widgets"] = [stats_label, toolbar]
+            
+            placeholder["figure"] = fig
+            placeholder["canvas"] = canvas
+            self.pack_live_widgets(placeholder)
+        return placeholder
+    
+    def pack_live_widgets(self, placeholder):
+        """Empaqueta la barra y las estadísticas abajo y el canvas en el espacio restante"""
+        canvas_widget = placeholder["canvas"].get_tk_widget()
+        # Volver a empaquetar en orden: el canvas expandible debe ir al final para no ocultar la barra
+        for widget in placeholder["live_widgets"] + [canvas_widget]:
+            widget.pack_forget()
+        for widget in placeholder["live_widgets"]:
+            widget.pack(side=tk.BOTTOM, fill=tk.X)
         canvas_widget.pack(fill=tk.BOTH, expand=True)
-        
-        return {"figure": fig, "canvas": canvas, "frame": container_frame}
     
-    def update_all_visualizations(self):
+    def tile_key(self, name, year):
+        """Clave de la imagen de una vista: el tamaño es el del área útil del placeholder (sin el padding)"""
+        placeholder = self.canvases[name]
+        return model_render.tile_key(name, year, placeholder["width"] - 20, placeholder["height"] - 20)
+    
+    def show_view(self, name, year, results):
+        """Muestra la vista desde la caché de imágenes si está renderizada; si no, la dibuja en vivo"""
+        self.canvases[name]["view_year"] = year
+        png = self.tile_cache.get(self.tile_key(name, year))
+        if png is not None:
+            self.show_tile(name, png)
+        else:
+            self.draw_live(name, year, results)
+    
+    def show_tile(self, name, png):
+        """Copia la imagen PNG directamente al placeholder, ocultando el canvas de matplotlib"""
+        placeholder = self.canvases[name]
+        if placeholder["tile_label"] is None:
+            label = ttk.Label(placeholder["frame"], cursor="hand2")
+            # Al hacer clic sobre la imagen se pasa a la figura interactiva
+            label.bind("<Button-1>", lambda event, name=name: self.on_tile_click(name))
+            placeholder["tile_label"] = label
+        # Mantener la referencia a PhotoImage: Tk no la conserva por sí solo
+        placeholder["photo"] = tk.PhotoImage(data=base64.b64encode(png))
+        placeholder["tile_label"].configure(image=placeholder["photo"])
+        if placeholder["canvas"] is not None:
+            for widget in placeholder["live_widgets"] + [placeholder["canvas"].get_tk_widget()]:
+                widget.pack_forget()
+        placeholder["tile_label"].pack(fill=tk.BOTH, expand=True)
+    
+    def draw_live(self, name, year, results):
+        """Dibuja la vista en el canvas interactivo de matplotlib"""
+        placeholder = self.canvases[name]
+        if placeholder["tile_label"] is not None:
+            placeholder["tile_label"].pack_forget()
+        placeholder = self.get_canvas(name)
+        model_render.draw_view(placeholder["figure"], name, results, year)
+        if name in MAP_VIEWS:
+            self.attach_viewport(name, model_render.VIEWS[name][1](results))
+        placeholder["canvas"].draw()
+        self.pack_live_widgets(placeholder)
+    
+    def attach_viewport(self, name, data):
+        """Indexa los puntos del mapa y conecta los cambios de límites de los ejes al redibujado"""
+        placeholder = self.canvases[name]
+        style = model_render.SCATTER_STYLES[name]
+        placeholder["viewport"] = {
+            "data": data,
+            "index": model_spatial.GridIndex(data[style["y"]], data[style["x"]]),
+        }
+        ax = placeholder["figure"].axes[0]
+        ax.callbacks.connect("xlim_changed", lambda ax, name=name: self.schedule_viewport_redraw(name))
+        ax.callbacks.connect("ylim_changed", lambda ax, name=name: self.schedule_viewport_redraw(name))
+        self.update_viewport_stats(name, data)
+    
+    def schedule_viewport_redraw(self, name):
+        """Agrupa los cambios de límites seguidos (arrastre, zoom) en un solo redibujado"""
+        placeholder = self.canvases[name]
+        if placeholder["viewport_after"] is not None:
+            self.root.after_cancel(placeholder["viewport_after"])
+        placeholder["viewport_after"] = self.root.after(150, lambda: self.redraw_viewport(name))
+    
+    def redraw_viewport(self, name):
+        """Redibuja solo los puntos dentro de los límites actuales de los ejes"""
+        placeholder = self.canvases[name]
+        placeholder["viewport_after"] = None
+        viewport = placeholder["viewport"]
+        ax = placeholder["figure"].axes[0]
+        (x0, x1), (y0, y1) = ax.get_xlim(), ax.get_ylim()
+        positions = viewport["index"].query(min(y0, y1), max(y0, y1), min(x0, x1), max(x0, x1))
+        visible = viewport["data"].iloc[positions]
+        # Con muchos puntos visibles se dibuja una muestra; las estadísticas usan todos
+        drawn = viewport["data"].iloc[model_spatial.sample_positions(positions)]
+        model_render.redraw_points(ax, name, drawn, viewport["data"])
+        self.update_viewport_stats(name, visible)
+        placeholder["canvas"].draw_idle()
+    
+    def update_viewport_stats(self, name, visible):
+        """Muestra las estadísticas de los puntos visibles debajo del mapa"""
+        if name == "regional":
+            stats = model_spatial.viewport_summary(visible, "cluster_region", "duracion_promedio", "frecuencia_incendios")
+            text = f"Zona visible: {stats['puntos']} celdas, {stats['incendios']} incendios"
+        else:
+            stats = model_spatial.viewport_summary(visible, "cluster_incendio", "Duración días")
+            text = f"Zona visible: {stats['incendios']} incendios"
+        if stats["puntos"]:
+            text += (f", duración media {stats['duracion_media']:.1f} días, "
+                     f"cluster predominante {stats['cluster_predominante']}")
+        self.canvases[name]["stats_var"].set(text)
+    
+    def on_tile_click(self, name):
+        """Sustituye la imagen por la figura en vivo para poder interactuar con los ejes"""
+        year = self.canvases[name]["view_year"]
+        try:
+            self.draw_live(name, year, self.get_year_results(year))
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al dibujar la figura: {str(e)}")
+    
+    def get_selected_tab(self):
+        """Retorna la clave de la pestaña visible en el notebook principal"""
+        selected = self.notebook.select()
+        for key, frame in self.tabs.items():
+            if str(frame) == selected:
+                return key
+        return None
+    
+    def on_tab_changed(self, event):
+        """Recalcula la pestaña seleccionada si quedó desactualizada tras un cambio de año"""
+        key = self.get_selected_tab()
+        # La tabla agregada existe en cuanto terminó la carga (df queda en None con SQLite)
+        if self.rollup is not None and key in self.stale_tabs:
+            self.refresh_tab(key)
+    
+    def refresh_tab(self, key):
+        """Recalcula y redibuja el contenido de una pestaña para el año actual"""
         self.status_var.set(f"Actualizando visualizaciones para el año {self.current_year.get()}...")
         self.root.update_idletasks()
         
-        # Limpiar leyendas anteriores
+        if key == "clusters":
+            self.update_regional_clusters()
+            self.update_individual_clusters()
+        elif key == "matrix":
+            self.update_risk_matrix()
+        elif key == "summary":
+            self.update_summary_data()
+        self.stale_tabs.discard(key)
+        
+        self.status_var.set(f"Visualizaciones actualizadas para el año {self.current_year.get()}")
+    
+    def update_all_visualizations(self):
+        # Mark every tab stale and refresh only the visible one; the others are
+        # recomputed on <<NotebookTabChanged>> so a year change costs one tab of work
+        self.stale_tabs = set(self.tabs)
+        
+        # Las leyendas pertenecen a la pestaña de clusters: limpiarlas para no mostrar otro año
         for widget in self.regional_legend_frame.winfo_children():
             widget.destroy()
         for widget in self.individual_legend_frame.winfo_children():
             widget.destroy()
         
-        # Update all visualizations for the selected year
-        self.update_regional_clusters()
-        self.update_individual_clusters()
-        self.update_risk_matrix()
-        self.update_summary_data()
+        self.refresh_tab(self.get_selected_tab())
         
-        self.status_var.set(f"Visualizaciones actualizadas para el año {self.current_year.get()}")
+        # Con el año actual ya dibujado, precalcular año-1 y año+1 en segundo plano
+        self.schedule_prefetch(self.current_year.get())
+    
+    def get_year_results(self, year):
+        """Retorna los resultados del año desde la caché, el precálculo en curso o calculándolos"""
+        results = self.year_cache.get(year)
+        if results is not None:
+            return results
+        
+        # Si el precálculo de este año ya empezó, esperar su resultado en vez de repetirlo
+        future = self.prefetch_futures.pop(year, None)
+        if future is not None and not future.cancel():
+            try:
+                results = future.result()
+            except Exception:
+                results = None
+            if results is not None:
+                return results
+        
+        start = time.perf_counter()
+        results = model_backend.compute_year_results(self.df, year, self.rollup, csv_file=self.csv_file)
+        self.year_cache.put(year, results, cost=time.perf_counter() - start)
+        return results
+    
+    def schedule_prefetch(self, year):
+        """Programa el cálculo de los años vecinos y cancela los que ya no lo son"""
+        targets = frozenset(
+            y for y in (year + 1, year - 1)
+            if self.min_year <= y <= self.max_year and y not in self.year_cache
+        )
+        self.prefetch_targets = targets
+        
+        # Cancelar los precálculos pendientes de años que ya no son vecinos
+        for y, future in list(self.prefetch_futures.items()):
+            if y not in targets or future.done():
+                future.cancel()
+                del self.prefetch_futures[y]
+        
+        # Siguiente año primero: es la navegación más habitual
+        for y in sorted(targets, reverse=True):
+            if y not in self.prefetch_futures:
+                self.prefetch_futures[y] = self.prefetch_executor.submit(self._prefetch_worker, y)
+        
+        # Después, renderizar las imágenes que falten del año actual y de los vecinos
+        self.render_years = tuple(y for y in (year, year + 1, year - 1) if self.min_year <= y <= self.max_year)
+        if self.render_future is not None:
+            self.render_future.cancel()
+        self.render_future = self.prefetch_executor.submit(self._render_worker, self.render_years)
+    
+    def _prefetch_worker(self, year):
+        """Calcula los resultados de un año en el hilo de fondo"""
+        if year not in self.prefetch_targets:
+            return None
+        start = time.perf_counter()
+        results = model_backend.compute_year_results(self.df, year, self.rollup, csv_file=self.csv_file)
+        # Si el usuario saltó a otro año mientras tanto, descartar el resultado
+        if year in self.prefetch_targets:
+            self.year_cache.put(year, results, cost=time.perf_counter() - start)
+        return results
+    
+    def _render_worker(self, years):
+        """Renderiza en el hilo de fondo las imágenes de los años que aún no están en caché"""
+        for year in years:
+            # Si el usuario cambió de año, el siguiente encargo ya cubre los años nuevos
+            if year not in self.render_years:
+                return
+            results = self.year_cache.get(year)
+            if results is not None:
+                self.render_tiles(year, results)
+    
+    def render_tiles(self, year, results):
+        """Renderiza en el proceso de renderizado (Agg) las vistas del año que faltan en la caché de imágenes"""
+        keys = [self.tile_key(name, year) for name in model_render.VIEWS]
+        missing = [key for key in keys if key not in self.tile_cache]
+        if not missing:
+            return
+        tiles = [(key[0],) + key[2] for key in missing]
+        start = time.perf_counter()
+        # El proceso de renderizado no pasa por fix_matplotlib_for_tkinter: recibe el estilo de este
+        pngs = self.render_executor.submit(model_render.render_pngs, tiles, results, year,
+                                           matplotlib_style()).result()
+        cost = (time.perf_counter() - start) / len(missing)
+        for key, tile in zip(missing, tiles):
+            self.tile_cache.put(key, pngs[tile], cost=cost)
+    
+    def on_close(self):
+        """Cancela los precálculos pendientes y cierra la ventana"""
+        self.prefetch_targets = frozenset()
+        self.render_years = ()
+        self.prefetch_executor.shutdown(wait=False, cancel_futures=True)
+        self.render_executor.shutdown(wait=False, cancel_futures=True)
+        if self.memory_after is not None:
+            self.root.after_cancel(self.memory_after)
+            self.memory_after = None
+        self.root.destroy()
     
     def update_regional_clusters(self):
         try:
             year = self.current_year.get()
-            reg_summary = model_backend.get_regional_summary_by_year(self.df, year)
-            reg_summary = model_backend.compute_regional_clusters(reg_summary)
+            results = self.get_year_results(year)
+            reg_summary = results['regional']
             
-            # Obtener la figura y limpiarla
-            fig = self.canvases["regional"]["figure"]
-            fig.clear()
+            # Limpiar leyenda anterior
+            for widget in self.regional_legend_frame.winfo_children():
+                widget.destroy()
             
-            # Crear un nuevo subplot que ocupe toda la figura
-            ax = fig.add_subplot(111)
-            
-            # Crear el scatter plot con tamaños adecuados
-            scatter = sns.scatterplot(
-                x='Longitud_round', y='Latitud_round', 
-                hue='cluster_region', size='frecuencia_incendios', 
-                sizes=(20, 200), palette='viridis', 
-                data=reg_summary, alpha=0.7, ax=ax,
-                legend=False  # No mostrar leyenda en el gráfico
-            )
-            
-            # Configurar el título y etiquetas
-            ax.set_title(f'Clusters Regionales - Año {year}', fontsize=16, pad=20)
-            ax.set_xlabel('Longitud', fontsize=14)
-            ax.set_ylabel('Latitud', fontsize=14)
-            
-            # Ajustar los límites del gráfico
-            ax.set_aspect('equal')  # Mantener la proporción correcta
-            
-            # Ajustar el layout para que todo quepa
-            fig.tight_layout()
-            
-            # Redibujar el canvas
-            self.canvases["regional"]["canvas"].draw()
+            # Mostrar la imagen prerrenderizada o dibujar la figura
+            self.show_view("regional", year, results)
             
             # Crear leyenda en el panel izquierdo
             ttk.Label(self.regional_legend_frame, text=f"Clusters Regionales - Año {year}", font=("Arial", 12, "bold")).pack(pady=5)
@@ -398,37 +736,15 @@ class WildfireAnalysisApp:
     def update_individual_clusters(self):
         try:
             year = self.current_year.get()
-            data_year, _ = model_backend.get_individual_summary_by_year(self.df, year)
-            
-            # Obtener la figura y limpiarla
-            fig = self.canvases["individual"]["figure"]
-            fig.clear()
+            results = self.get_year_results(year)
+            data_year = results['individual']['data']
             
-            # Crear un nuevo subplot que ocupe toda la figura
-            ax = fig.add_subplot(111)
-            
-            # Crear el scatter plot con tamaños adecuados
-            scatter = sns.scatterplot(
-                x='Longitud', y='Latitud', 
-                hue='cluster_incendio', size='Duración días', 
-                sizes=(10, 100), palette='plasma', 
-                data=data_year, alpha=0.5, ax=ax,
-                legend=False  # No mostrar leyenda en el gráfico
-            )
-            
-            # Configurar el título y etiquetas
-            ax.set_title(f'Clusters Individuales - Año {year}', fontsize=16, pad=20)
-            ax.set_xlabel('Longitud', fontsize=14)
-            ax.set_ylabel('Latitud', fontsize=14)
+            # Limpiar leyenda anterior
+            for widget in self.individual_legend_frame.winfo_children():
+                widget.destroy()
             
-            # Ajustar los límites del gráfico
-            ax.set_aspect('equal')  # Mantener la proporción correcta
-            
-            # Ajustar el layout para que todo quepa
-            fig.tight_layout()
-            
-            # Redibujar el canvas
-            self.canvases["individual"]["canvas"].draw()
+            # Mostrar la imagen prerrenderizada o dibujar la figura
+            self.show_view("individual", year, results)
             
             # Crear leyenda en el panel izquierdo
             ttk.Label(self.individual_legend_frame, text=f"Clusters Individuales - Año {year}", font=("Arial", 12, "bold")).pack(pady=5)
@@ -482,29 +798,7 @@ class WildfireAnalysisApp:
     def update_risk_matrix(self):
         try:
             year = self.current_year.get()
-            risk_matrix = model_backend.compute_risk_matrix_by_year(self.df, year)
-            
-            fig = self.canvases["matrix"]["figure"]
-            fig.clear()
-            ax = fig.add_subplot(111)
-            
-            # Verificar si la matriz de riesgo está vacía
-            if risk_matrix.empty:
-                ax.text(0.5, 0.5, f"No hay datos suficientes para generar la matriz de riesgo en {year}",
-                        transform=ax.transAxes, ha="center", va="center", fontsize=16)
-            else:
-                # Crear el heatmap con anotaciones
-                sns.heatmap(
-                    risk_matrix, annot=True, fmt='g', 
-                    cmap='YlOrRd', ax=ax,
-                    cbar_kws={'label': 'Nivel de Riesgo'}
-                )
-                ax.set_title(f'Matriz de Riesgo - Año {year}', fontsize=16, pad=20)
-                ax.set_xlabel('Cluster Incendio Individual', fontsize=14)
-                ax.set_ylabel('Cluster Regional', fontsize=14)
-            
-            fig.tight_layout()
-            self.canvases["matrix"]["canvas"].draw()
+            self.show_view("matrix", year, self.get_year_results(year))
             
         except Exception as e:
             messagebox.showerror("Error", f"Error al generar matriz de riesgo: {str(e)}")
@@ -514,257 +808,358 @@ class WildfireAnalysisApp:
             year = self.current_year.get()
             
             # Top 10 regions
-            top10 = model_backend.get_top10_regions_by_year(self.df, year)
+            results = self.get_year_results(year)
+            top10 = results['top10_regiones']
             self.top10_text.delete(1.0, tk.END)
             self.top10_text.insert(tk.END, f"TOP 10 REGIONES - AÑO {year}\n\n")
             self.top10_text.insert(tk.END, top10[['Latitud_round', 'Longitud_round', 'frecuencia_incendios', 'vegetacion_predominante']].to_string(index=False))
             
             # Ecosystem summary
-            eco = model_backend.get_ecosystem_summary_by_year(self.df, year)
+            eco = results['ecosistema_summary']
             self.eco_text.delete(1.0, tk.END)
             self.eco_text.insert(tk.END, f"RESUMEN DE ECOSISTEMAS - AÑO {year}\n\n")
             self.eco_text.insert(tk.END, eco.to_string(index=False))
         except Exception as e:
             messagebox.showerror("Error", f"Error al mostrar datos de resumen: {str(e)}")
     
+    def get_historical(self, name, compute, **kwargs):
+        """Retorna un resultado histórico desde la caché o calculándolo con compute()"""
+        results = self.historical_cache.get(name)
+        if results is None:
+            start = time.perf_counter()
+            results = compute(self.csv_file, df=self.df, **kwargs)
+            self.historical_cache.put(name, results, cost=time.perf_counter() - start)
+        return results
+    
     def show_historical_analysis(self):
+        """
+        Abre la ventana histórica de inmediato y refina sus gráficos a medida que avanza el análisis.
+        Retorna el diccionario de la ventana (su clave "stage" indica la última etapa dibujada).
+        """
         try:
-            results = model_backend.historical_analysis('BD.csv')
-            
-            # Create a new window
-            hist_window = tk.Toplevel(self.root)
-            hist_window.title("Análisis Histórico (2015-2023)")
-            hist_window.geometry("1000x700")
-            
-            # Create notebook for tabs
-            notebook = ttk.Notebook(hist_window)
-            notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-            
-            # Regional clusters tab with scrollbar
-            regional_tab = ttk.Frame(notebook)
-            notebook.add(regional_tab, text="Clusters Regionales")
-            
-            # Crear un panel horizontal para la leyenda y el gráfico
-            regional_panel = ttk.PanedWindow(regional_tab, orient=tk.HORIZONTAL)
-            regional_panel.pack(fill=tk.BOTH, expand=True)
-            
-            # Panel izquierdo para la leyenda con scroll
-            regional_legend_panel = ttk.Frame(regional_panel, width=200)
-            regional_panel.add(regional_legend_panel, weight=1)
-            
-            # Crear canvas con scrollbar para la leyenda
-            regional_legend_canvas = tk.Canvas(regional_legend_panel)
-            regional_legend_scrollbar = ttk.Scrollbar(regional_legend_panel, orient="vertical", command=regional_legend_canvas.yview)
-            regional_legend_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            regional_legend_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            regional_legend_canvas.configure(yscrollcommand=regional_legend_scrollbar.set)
-            
-            regional_legend_content = ttk.Frame(regional_legend_canvas)
-            regional_legend_canvas.create_window((0, 0), window=regional_legend_content, anchor="nw")
-            
-            # Panel derecho para el gráfico con scroll
-            regional_graph_panel = ttk.Frame(regional_panel)
-            regional_panel.add(regional_graph_panel, weight=4)
-            
-            regional_canvas = tk.Canvas(regional_graph_panel)
-            regional_scrollbar = ttk.Scrollbar(regional_graph_panel, orient="vertical", command=regional_canvas.yview)
-            regional_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            regional_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            # CORRECCIÓN: Eliminamos 'fill' y 'expand' de configure
-            regional_canvas.configure(yscrollcommand=regional_scrollbar.set)
-            
-            regional_content = ttk.Frame(regional_canvas)
-            regional_canvas.create_window((0, 0), window=regional_content, anchor="nw")
-            
-            # Crear figura con tamaño fijo
-            fig1_frame = ttk.Frame(regional_content, width=900, height=600)
-            fig1_frame.pack(padx=10, pady=10)
-            fig1_frame.pack_propagate(False)
-            
-            fig1 = Figure(figsize=(9, 6), dpi=100)
-            ax1 = fig1.add_subplot(111)
-            
-            # Crear el scatter plot sin leyenda en el gráfico
-            scatter = sns.scatterplot(
-                x='Longitud_round', y='Latitud_round', 
-                hue='cluster_region', size='frecuencia_incendios', 
-                sizes=(20, 200), palette='viridis', 
-                data=results['regional'], alpha=0.7, ax=ax1,
-                legend=False
-            )
-            
-            ax1.set_title('Clusters Regionales Históricos (2015-2023)', fontsize=16, pad=20)
-            ax1.set_xlabel('Longitud', fontsize=14)
-            ax1.set_ylabel('Latitud', fontsize=14)
-            ax1.set_aspect('equal')
-            
-            fig1.tight_layout()
-            
-            canvas1 = FigureCanvasTkAgg(fig1, master=fig1_frame)
-            canvas1.draw()
-            canvas1.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-            
-            # Crear leyenda en el panel izquierdo
-            ttk.Label(regional_legend_content, text="Clusters Regionales", font=("Arial", 12, "bold")).pack(pady=5)
-            
-            # Crear leyenda para clusters regionales
-            unique_clusters = results['regional']['cluster_region'].unique()
-            colors = plt.cm.viridis(np.linspace(0, 1, len(unique_clusters)))
-            
-            for i, cluster in enumerate(sorted(unique_clusters)):
-                cluster_frame = ttk.Frame(regional_legend_content)
-                cluster_frame.pack(fill=tk.X, pady=2)
-                
-                # Crear un cuadrado de color para el cluster
-                color_canvas = tk.Canvas(cluster_frame, width=15, height=15, bg=self.rgb_to_hex(colors[i][:3]))
-                color_canvas.pack(side=tk.LEFT, padx=5)
-                
-                # Etiqueta con el número de cluster
-                ttk.Label(cluster_frame, text=f"Cluster {cluster}").pack(side=tk.LEFT, padx=5)
-            
-            # Leyenda para tamaño de puntos
-            ttk.Label(regional_legend_content, text="Frecuencia de Incendios", font=("Arial", 10, "bold")).pack(pady=5)
-            
-            # Mostrar rangos de frecuencia
-            freq_ranges = [(15, "Baja"), (45, "Media"), (75, "Alta")]
-            for size, label in freq_ranges:
-                size_frame = ttk.Frame(regional_legend_content)
-                size_frame.pack(fill=tk.X, pady=2)
-                
-                # Crear un círculo proporcional al tamaño
-                size_canvas = tk.Canvas(size_frame, width=30, height=20)
-                size_canvas.pack(side=tk.LEFT, padx=5)
-                radius = min(size / 3, 8)
-                size_canvas.create_oval(15-radius, 10-radius, 15+radius, 10+radius, fill="gray")
-                
-                # Etiqueta con el rango
-                ttk.Label(size_frame, text=f"{label} ({size})").pack(side=tk.LEFT, padx=5)
-            
-            regional_legend_content.bind("<Configure>", lambda e: regional_legend_canvas.configure(scrollregion=regional_legend_canvas.bbox("all")))
-            regional_content.bind("<Configure>", lambda e: regional_canvas.configure(scrollregion=regional_canvas.bbox("all")))
-            
-            # Individual clusters tab
-            individual_tab = ttk.Frame(notebook)
-            notebook.add(individual_tab, text="Clusters Individuales")
-            
-            individual_panel = ttk.PanedWindow(individual_tab, orient=tk.HORIZONTAL)
-            individual_panel.pack(fill=tk.BOTH, expand=True)
-            
-            individual_legend_panel = ttk.Frame(individual_panel, width=200)
-            individual_panel.add(individual_legend_panel, weight=1)
-            
-            individual_legend_canvas = tk.Canvas(individual_legend_panel)
-            individual_legend_scrollbar = ttk.Scrollbar(individual_legend_panel, orient="vertical", command=individual_legend_canvas.yview)
-            individual_legend_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            individual_legend_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            individual_legend_canvas.configure(yscrollcommand=individual_legend_scrollbar.set)
-            
-            individual_legend_content = ttk.Frame(individual_legend_canvas)
-            individual_legend_canvas.create_window((0, 0), window=individual_legend_content, anchor="nw")
-            
-            individual_graph_panel = ttk.Frame(individual_panel)
-            individual_panel.add(individual_graph_panel, weight=4)
-            
-            individual_canvas = tk.Canvas(individual_graph_panel)
-            individual_scrollbar = ttk.Scrollbar(individual_graph_panel, orient="vertical", command=individual_canvas.yview)
-            individual_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            individual_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            individual_canvas.configure(yscrollcommand=individual_scrollbar.set)
-            
-            individual_content = ttk.Frame(individual_canvas)
-            individual_canvas.create_window((0, 0), window=individual_content, anchor="nw")
-            
-            fig2_frame = ttk.Frame(individual_content, width=900, height=600)
-            fig2_frame.pack(padx=10, pady=10)
-            fig2_frame.pack_propagate(False)
-            
-            fig2 = Figure(figsize=(9, 6), dpi=100)
-            ax2 = fig2.add_subplot(111)
-            
-            ind_summary = results['individual']['summary']
-            sns.barplot(
-                x='cluster_incendio', y='num_incendios', 
-                data=ind_summary, ax=ax2, palette='plasma',
-                legend=False
-            )
-            
-            ax2.set_title('Clusters Individuales Históricos (2015-2023)', fontsize=16, pad=20)
-            ax2.set_xlabel('Cluster Incendio', fontsize=14)
-            ax2.set_ylabel('Número de Incendios', fontsize=14)
-            for i, v in enumerate(ind_summary['num_incendios']):
-                ax2.text(i, v + 5, str(v), ha='center', fontsize=12)
-            
-            fig2.tight_layout()
-            
-            canvas2 = FigureCanvasTkAgg(fig2, master=fig2_frame)
-            canvas2.draw()
-            canvas2.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-            
-            ttk.Label(individual_legend_content, text="Clusters Individuales", font=("Arial", 12, "bold")).pack(pady=5)
-            unique_clusters = ind_summary['cluster_incendio'].unique()
-            colors = plt.cm.plasma(np.linspace(0, 1, len(unique_clusters)))
-            
-            for i, cluster in enumerate(sorted(unique_clusters)):
-                cluster_frame = ttk.Frame(individual_legend_content)
-                cluster_frame.pack(fill=tk.X, pady=2)
-                color_canvas = tk.Canvas(cluster_frame, width=15, height=15, bg=self.rgb_to_hex(colors[i][:3]))
-                color_canvas.pack(side=tk.LEFT, padx=5)
-                ttk.Label(cluster_frame, text=f"Cluster {cluster}").pack(side=tk.LEFT, padx=5)
-            
-            individual_legend_content.bind("<Configure>", lambda e: individual_legend_canvas.configure(scrollregion=individual_legend_canvas.bbox("all")))
-            individual_content.bind("<Configure>", lambda e: individual_canvas.configure(scrollregion=individual_canvas.bbox("all")))
-            
-            # Timeline tab
-            timeline_tab = ttk.Frame(notebook)
-            notebook.add(timeline_tab, text="Línea de Tiempo")
-            
-            timeline_canvas = tk.Canvas(timeline_tab)
-            timeline_scrollbar = ttk.Scrollbar(timeline_tab, orient="vertical", command=timeline_canvas.yview)
-            timeline_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            timeline_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            timeline_canvas.configure(yscrollcommand=timeline_scrollbar.set)
-            
-            timeline_content = ttk.Frame(timeline_canvas)
-            timeline_canvas.create_window((0, 0), window=timeline_content, anchor="nw")
-            
-            fig3_frame = ttk.Frame(timeline_content, width=900, height=600)
-            fig3_frame.pack(padx=10, pady=10)
-            fig3_frame.pack_propagate(False)
-            
-            fig3 = Figure(figsize=(9, 6), dpi=100)
-            ax3 = fig3.add_subplot(111)
-            
-            yearly_counts = self.df.groupby('Año').size().reset_index(name='Incendios')
-            sns.lineplot(
-                x='Año', y='Incendios', 
-                data=yearly_counts, marker='o', 
-                linewidth=2, markersize=10, ax=ax3,
-                color='#1f77b4'
-            )
-            
-            ax3.set_title('Evolución de Incendios por Año (2015-2023)', fontsize=16, pad=20)
-            ax3.set_xlabel('Año', fontsize=14)
-            ax3.set_ylabel('Número de Incendios', fontsize=14)
-            ax3.grid(True, linestyle='--', alpha=0.7)
-            for x, y in zip(yearly_counts['Año'], yearly_counts['Incendios']):
-                ax3.text(x, y + 5, str(y), ha='center', fontsize=12)
-            
-            fig3.tight_layout()
-            
-            canvas3 = FigureCanvasTkAgg(fig3, master=fig3_frame)
-            canvas3.draw()
-            canvas3.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-            
-            timeline_content.bind("<Configure>", lambda e: timeline_canvas.configure(scrollregion=timeline_canvas.bbox("all")))
-            
+            window = self.create_historical_window()
         except Exception as e:
             messagebox.showerror("Error", f"Error en el análisis histórico: {str(e)}")
             import traceback
             traceback.print_exc()
+            return
+        results = self.historical_cache.get("analysis")
+        if results is not None:
+            self.update_historical_window(window, "final", results)
+            return window
+        # Las etapas (resumen, preliminar, final) las calcula un único hilo; cada ventana lee las que lleguen
+        if self.historical_run is None:
+            self.historical_run = {"stages": [], "error": None}
+            threading.Thread(target=self._historical_worker, args=(self.historical_run,), daemon=True).start()
+        window["run"] = self.historical_run
+        window["seen"] = 0
+        self.root.after(50, lambda: self._poll_historical(window))
+        return window
+    
+    def _historical_worker(self, run):
+        """Calcula las etapas; la final se guarda en la caché aunque se hayan cerrado las ventanas"""
+        start = time.perf_counter()
+        try:
+            for stage, results in model_backend.historical_analysis_progressive(
+                    self.csv_file, df=self.df, rollup=self.rollup):
+                if stage == "final":
+                    self.historical_cache.put("analysis", results, cost=time.perf_counter() - start)
+                run["stages"].append((stage, results))
+        except Exception as e:
+            run["error"] = e
+        finally:
+            if self.historical_run is run:
+                self.historical_run = None
+    
+    def _poll_historical(self, window):
+        """Dibuja la etapa más reciente del análisis histórico (desde el hilo de Tk)"""
+        if not window["toplevel"].winfo_exists():
+            return
+        run = window["run"]
+        stages = run["stages"]
+        if len(stages) > window["seen"]:
+            window["seen"] = len(stages)
+            stage, payload = stages[-1]
+            try:
+                self.update_historical_window(window, stage, payload)
+            except Exception as e:
+                messagebox.showerror("Error", f"Error en el análisis histórico: {str(e)}")
+                import traceback
+                traceback.print_exc()
+                return
+            if stage == "final":
+                return
+        elif run["error"] is not None:
+            window["status_var"].set("Error en el análisis histórico")
+            messagebox.showerror("Error", f"Error en el análisis histórico: {str(run['error'])}")
+            return
+        self.root.after(50, lambda: self._poll_historical(window))
+    
+    def update_historical_window(self, window, stage, results):
+        """Redibuja los gráficos de la ventana histórica con los resultados de una etapa"""
+        window["stage"] = stage
+        window["status_var"].set(HISTORICAL_STAGES[stage])
+        self.draw_historical_regional(window, results['regional'])
+        self.draw_historical_individual(window, results['individual'])
+    
+    def create_historical_window(self):
+        """Crea la ventana del análisis histórico con sus pestañas; los clústeres se dibujan después"""
+        # Create a new window
+        hist_window = tk.Toplevel(self.root)
+        hist_window.title("Análisis Histórico (2015-2023)")
+        hist_window.geometry("1000x700")
+        window = {"toplevel": hist_window, "status_var": tk.StringVar(value=HISTORICAL_STAGES["inicio"])}
+        
+        # Etapa del cálculo progresivo
+        ttk.Label(hist_window, textvariable=window["status_var"]).pack(fill=tk.X, padx=10, pady=(10, 0))
+        
+        # Create notebook for tabs
+        notebook = ttk.Notebook(hist_window)
+        notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        # Regional clusters tab with scrollbar
+        regional_tab = ttk.Frame(notebook)
+        notebook.add(regional_tab, text="Clusters Regionales")
+        
+        # Crear un panel horizontal para la leyenda y el gráfico
+        regional_panel = ttk.PanedWindow(regional_tab, orient=tk.HORIZONTAL)
+        regional_panel.pack(fill=tk.BOTH, expand=True)
+        
+        # Panel izquierdo para la leyenda con scroll
+        regional_legend_panel = ttk.Frame(regional_panel, width=200)
+        regional_panel.add(regional_legend_panel, weight=1)
+        
+        # Crear canvas con scrollbar para la leyenda
+        regional_legend_canvas = tk.Canvas(regional_legend_panel)
+        regional_legend_scrollbar = ttk.Scrollbar(regional_legend_panel, orient="vertical", command=regional_legend_canvas.yview)
+        regional_legend_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        regional_legend_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        regional_legend_canvas.configure(yscrollcommand=regional_legend_scrollbar.set)
+        
+        regional_legend_content = ttk.Frame(regional_legend_canvas)
+        regional_legend_canvas.create_window((0, 0), window=regional_legend_content, anchor="nw")
+        
+        # Panel derecho para el gráfico con scroll
+        regional_graph_panel = ttk.Frame(regional_panel)
+        regional_panel.add(regional_graph_panel, weight=4)
+        
+        regional_canvas = tk.Canvas(regional_graph_panel)
+        regional_scrollbar = ttk.Scrollbar(regional_graph_panel, orient="vertical", command=regional_canvas.yview)
+        regional_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        regional_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        # CORRECCIÓN: Eliminamos 'fill' y 'expand' de configure
+        regional_canvas.configure(yscrollcommand=regional_scrollbar.set)
+        
+        regional_content = ttk.Frame(regional_canvas)
+        regional_canvas.create_window((0, 0), window=regional_content, anchor="nw")
+        
+        # Crear figura con tamaño fijo
+        fig1_frame = ttk.Frame(regional_content, width=900, height=600)
+        fig1_frame.pack(padx=10, pady=10)
+        fig1_frame.pack_propagate(False)
+        
+        fig1 = mpl_figure.Figure(figsize=(9, 6), dpi=100)
+        window["ax1"] = fig1.add_subplot(111)
+        window["canvas1"] = backend_tkagg.FigureCanvasTkAgg(fig1, master=fig1_frame)
+        window["canvas1"].get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        # Crear leyenda en el panel izquierdo
+        ttk.Label(regional_legend_content, text="Clusters Regionales", font=("Arial", 12, "bold")).pack(pady=5)
+        
+        # Los colores de los clusters se llenan al dibujar cada etapa
+        window["regional_legend"] = ttk.Frame(regional_legend_content)
+        window["regional_legend"].pack(fill=tk.X)
+        
+        # Leyenda para tamaño de puntos
+        ttk.Label(regional_legend_content, text="Frecuencia de Incendios", font=("Arial", 10, "bold")).pack(pady=5)
+        
+        # Mostrar rangos de frecuencia
+        freq_ranges = [(15, "Baja"), (45, "Media"), (75, "Alta")]
+        for size, label in freq_ranges:
+            size_frame = ttk.Frame(regional_legend_content)
+            size_frame.pack(fill=tk.X, pady=2)
+            
+            # Crear un círculo proporcional al tamaño
+            size_canvas = tk.Canvas(size_frame, width=30, height=20)
+            size_canvas.pack(side=tk.LEFT, padx=5)
+            radius = min(size / 3, 8)
+            size_canvas.create_oval(15-radius, 10-radius, 15+radius, 10+radius, fill="gray")
+            
+            # Etiqueta con el rango
+            ttk.Label(size_frame, text=f"{label} ({size})").pack(side=tk.LEFT, padx=5)
+        
+        regional_legend_content.bind("<Configure>", lambda e: regional_legend_canvas.configure(scrollregion=regional_legend_canvas.bbox("all")))
+        regional_content.bind("<Configure>", lambda e: regional_canvas.configure(scrollregion=regional_canvas.bbox("all")))
+        
+        # Individual clusters tab
+        individual_tab = ttk.Frame(notebook)
+        notebook.add(individual_tab, text="Clusters Individuales")
+        
+        individual_panel = ttk.PanedWindow(individual_tab, orient=tk.HORIZONTAL)
+        individual_panel.pack(fill=tk.BOTH, expand=True)
+        
+        individual_legend_panel = ttk.Frame(individual_panel, width=200)
+        individual_panel.add(individual_legend_panel, weight=1)
+        
+        individual_legend_canvas = tk.Canvas(individual_legend_panel)
+        individual_legend_scrollbar = ttk.Scrollbar(individual_legend_panel, orient="vertical", command=individual_legend_canvas.yview)
+        individual_legend_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        individual_legend_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        individual_legend_canvas.configure(yscrollcommand=individual_legend_scrollbar.set)
+        
+        individual_legend_content = ttk.Frame(individual_legend_canvas)
+        individual_legend_canvas.create_window((0, 0), window=individual_legend_content, anchor="nw")
+        
+        individual_graph_panel = ttk.Frame(individual_panel)
+        individual_panel.add(individual_graph_panel, weight=4)
+        
+        individual_canvas = tk.Canvas(individual_graph_panel)
+        individual_scrollbar = ttk.Scrollbar(individual_graph_panel, orient="vertical", command=individual_canvas.yview)
+        individual_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        individual_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        individual_canvas.configure(yscrollcommand=individual_scrollbar.set)
+        
+        individual_content = ttk.Frame(individual_canvas)
+        individual_canvas.create_window((0, 0), window=individual_content, anchor="nw")
+        
+        fig2_frame = ttk.Frame(individual_content, width=900, height=600)
+        fig2_frame.pack(padx=10, pady=10)
+        fig2_frame.pack_propagate(False)
+        
+        fig2 = mpl_figure.Figure(figsize=(9, 6), dpi=100)
+        window["ax2"] = fig2.add_subplot(111)
+        window["canvas2"] = backend_tkagg.FigureCanvasTkAgg(fig2, master=fig2_frame)
+        window["canvas2"].get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        ttk.Label(individual_legend_content, text="Clusters Individuales", font=("Arial", 12, "bold")).pack(pady=5)
+        window["individual_legend"] = ttk.Frame(individual_legend_content)
+        window["individual_legend"].pack(fill=tk.X)
+        
+        individual_legend_content.bind("<Configure>", lambda e: individual_legend_canvas.configure(scrollregion=individual_legend_canvas.bbox("all")))
+        individual_content.bind("<Configure>", lambda e: individual_canvas.configure(scrollregion=individual_canvas.bbox("all")))
+        
+        # Timeline tab (sale de la tabla agregada, no espera al análisis)
+        timeline_tab = ttk.Frame(notebook)
+        notebook.add(timeline_tab, text="Línea de Tiempo")
+        
+        timeline_canvas = tk.Canvas(timeline_tab)
+        timeline_scrollbar = ttk.Scrollbar(timeline_tab, orient="vertical", command=timeline_canvas.yview)
+        timeline_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        timeline_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        timeline_canvas.configure(yscrollcommand=timeline_scrollbar.set)
+        
+        timeline_content = ttk.Frame(timeline_canvas)
+        timeline_canvas.create_window((0, 0), window=timeline_content, anchor="nw")
+        
+        fig3_frame = ttk.Frame(timeline_content, width=900, height=600)
+        fig3_frame.pack(padx=10, pady=10)
+        fig3_frame.pack_propagate(False)
+        
+        fig3 = mpl_figure.Figure(figsize=(9, 6), dpi=100)
+        ax3 = fig3.add_subplot(111)
+        
+        yearly_counts = self.rollup.yearly_counts()
+        sns.lineplot(
+            x='Año', y='Incendios', 
+            data=yearly_counts, marker='o', 
+            linewidth=2, markersize=10, ax=ax3,
+            color='#1f77b4'
+        )
+        
+        ax3.set_title('Evolución de Incendios por Año (2015-2023)', fontsize=16, pad=20)
+        ax3.set_xlabel('Año', fontsize=14)
+        ax3.set_ylabel('Número de Incendios', fontsize=14)
+        ax3.grid(True, linestyle='--', alpha=0.7)
+        for x, y in zip(yearly_counts['Año'], yearly_counts['Incendios']):
+            ax3.text(x, y + 5, str(y), ha='center', fontsize=12)
+        
+        fig3.tight_layout()
+        
+        canvas3 = backend_tkagg.FigureCanvasTkAgg(fig3, master=fig3_frame)
+        canvas3.draw()
+        canvas3.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        timeline_content.bind("<Configure>", lambda e: timeline_canvas.configure(scrollregion=timeline_canvas.bbox("all")))
+        
+        # Mientras llega la primera etapa, los gráficos de clústeres muestran un aviso
+        for ax, canvas in ((window["ax1"], window["canvas1"]), (window["ax2"], window["canvas2"])):
+            ax.text(0.5, 0.5, "Calculando...", ha='center', va='center', fontsize=14, transform=ax.transAxes)
+            ax.set_axis_off()
+            canvas.draw()
+        return window
+    
+    def fill_cluster_legend(self, legend, clusters, cmap):
+        """Rehace la lista de colores por cluster de una leyenda"""
+        for child in legend.winfo_children():
+            child.destroy()
+        colors = cmap(np.linspace(0, 1, len(clusters)))
+        for i, cluster in enumerate(sorted(clusters)):
+            cluster_frame = ttk.Frame(legend)
+            cluster_frame.pack(fill=tk.X, pady=2)
+            
+            # Crear un cuadrado de color para el cluster
+            color_canvas = tk.Canvas(cluster_frame, width=15, height=15, bg=self.rgb_to_hex(colors[i][:3]))
+            color_canvas.pack(side=tk.LEFT, padx=5)
+            
+            # Etiqueta con el número de cluster
+            ttk.Label(cluster_frame, text=f"Cluster {cluster}").pack(side=tk.LEFT, padx=5)
+    
+    def draw_historical_regional(self, window, regional):
+        """Dibuja el mapa regional histórico; sin cluster_region (etapa de resumen) solo muestra la frecuencia"""
+        ax1 = window["ax1"]
+        ax1.clear()
+        ax1.set_axis_on()
+        clustered = 'cluster_region' in regional
+        
+        # Crear el scatter plot sin leyenda en el gráfico
+        style = {'hue': 'cluster_region', 'palette': 'viridis'} if clustered else {'color': 'gray'}
+        sns.scatterplot(
+            x='Longitud_round', y='Latitud_round', 
+            size='frecuencia_incendios', sizes=(20, 200), 
+            data=regional, alpha=0.7, ax=ax1,
+            legend=False, **style
+        )
+        
+        ax1.set_title('Clusters Regionales Históricos (2015-2023)', fontsize=16, pad=20)
+        ax1.set_xlabel('Longitud', fontsize=14)
+        ax1.set_ylabel('Latitud', fontsize=14)
+        ax1.set_aspect('equal')
+        
+        ax1.figure.tight_layout()
+        window["canvas1"].draw()
+        
+        clusters = regional['cluster_region'].unique() if clustered else []
+        self.fill_cluster_legend(window["regional_legend"], clusters, plt.cm.viridis)
+    
+    def draw_historical_individual(self, window, individual):
+        """Dibuja el número de incendios por cluster individual (None mientras no hay clústeres)"""
+        if individual is None:
+            return
+        ax2 = window["ax2"]
+        ax2.clear()
+        ax2.set_axis_on()
+        
+        ind_summary = individual['summary']
+        sns.barplot(
+            x='cluster_incendio', y='num_incendios', 
+            data=ind_summary, ax=ax2, palette='plasma',
+            legend=False
+        )
+        
+        ax2.set_title('Clusters Individuales Históricos (2015-2023)', fontsize=16, pad=20)
+        ax2.set_xlabel('Cluster Incendio', fontsize=14)
+        ax2.set_ylabel('Número de Incendios', fontsize=14)
+        for i, v in enumerate(ind_summary['num_incendios']):
+            ax2.text(i, v + 5, str(v), ha='center', fontsize=12)
+        
+        ax2.figure.tight_layout()
+        window["canvas2"].draw()
+        
+        self.fill_cluster_legend(window["individual_legend"], ind_summary['cluster_incendio'].unique(), plt.cm.plasma)
     
     def show_historical_risk_matrix(self):
         try:
-            risk_matrix = model_backend.compute_risk_matrix_historical('BD.csv')
+            risk_matrix = self.get_historical("risk_matrix", model_backend.compute_risk_matrix_historical)
             
             matrix_window = tk.Toplevel(self.root)
             matrix_window.title("Matriz de Riesgo Histórica (2015-2023)")
@@ -783,7 +1178,7 @@ class WildfireAnalysisApp:
             fig_frame.pack(padx=10, pady=10)
             fig_frame.pack_propagate(False)
             
-            fig = Figure(figsize=(7, 6), dpi=100)
+            fig = mpl_figure.Figure(figsize=(7, 6), dpi=100)
             ax = fig.add_subplot(111)
             
             sns.heatmap(
@@ -799,7 +1194,7 @@ class WildfireAnalysisApp:
             
             fig.tight_layout()
             
-            canvas = FigureCanvasTkAgg(fig, master=fig_frame)
+            canvas = backend_tkagg.FigureCanvasTkAgg(fig, master=fig_frame)
             canvas.draw()
             canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
             
@@ -822,7 +1217,7 @@ class WildfireAnalysisApp:
             top10_tab = ttk.Frame(notebook)
             notebook.add(top10_tab, text="Top 10 Regiones")
             
-            top10 = model_backend.get_top10_regions_historical('BD.csv')
+            top10 = self.get_historical("top10", model_backend.get_top10_regions_historical)
             
             top10_text = scrolledtext.ScrolledText(top10_tab, width=80, height=20)
             top10_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -832,7 +1227,7 @@ class WildfireAnalysisApp:
             eco_tab = ttk.Frame(notebook)
             notebook.add(eco_tab, text="Resumen Ecosistemas")
             
-            eco = model_backend.get_ecosystem_summary_historical('BD.csv')
+            eco = self.get_historical("ecosystem", model_backend.get_ecosystem_summary_historical, rollup=self.rollup)
             
             eco_text = scrolledtext.ScrolledText(eco_tab, width=80, height=20)
             eco_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -855,10 +1250,10 @@ class WildfireAnalysisApp:
             fig_frame.pack(padx=10, pady=10)
             fig_frame.pack_propagate(False)
             
-            fig = Figure(figsize=(9, 6), dpi=100)
+            fig = mpl_figure.Figure(figsize=(9, 6), dpi=100)
             ax = fig.add_subplot(111)
             
-            eco_yearly = self.df.groupby(['Año', 'Ecosistema']).size().reset_index(name='Incendios')
+            eco_yearly = self.rollup.ecosystem_by_year()
             eco_pivot = eco_yearly.pivot(index='Año', columns='Ecosistema', values='Incendios').fillna(0)
             
             eco_pivot.plot(kind='bar', stacked=True, ax=ax, colormap='viridis')
@@ -870,7 +1265,7 @@ class WildfireAnalysisApp:
             
             fig.tight_layout()
             
-            canvas = FigureCanvasTkAgg(fig, master=fig_frame)
+            canvas = backend_tkagg.FigureCanvasTkAgg(fig, master=fig_frame)
             canvas.draw()
             canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
             
@@ -882,6 +1277,32 @@ class WildfireAnalysisApp:
             traceback.print_exc()
 
 # Función para probar la aplicación de forma independiente
+# Estilo de matplotlib de la interfaz; el proceso de renderizado de imágenes lo recibe con
+# cada encargo (ver matplotlib_style) para dibujar igual que los canvas en vivo
+MATPLOTLIB_STYLE = {
+    'figure.autolayout': True,
+    'figure.figsize': [10, 6],
+    'figure.dpi': 100,
+    'font.size': 12,
+    'legend.fontsize': 10,
+    'figure.titlesize': 16,
+    'axes.labelsize': 14,
+    'axes.titlesize': 16,
+    'xtick.labelsize': 12,
+    'ytick.labelsize': 12,
+}
+
+def apply_matplotlib_style():
+    """Aplica MATPLOTLIB_STYLE a matplotlib.rcParams sin cambiar de backend"""
+    import matplotlib
+    # (matplotlib.rcParams es el mismo objeto que plt.rcParams, pero no importa pyplot al arrancar)
+    matplotlib.rcParams.update(MATPLOTLIB_STYLE)
+
+def matplotlib_style():
+    """Valores actuales de este proceso para las claves de MATPLOTLIB_STYLE"""
+    import matplotlib
+    return {key: matplotlib.rcParams[key] for key in MATPLOTLIB_STYLE}
+
 def fix_matplotlib_for_tkinter():
     """
     Solución para problemas de visualización de matplotlib en Tkinter
@@ -890,16 +1311,7 @@ def fix_matplotlib_for_tkinter():
     matplotlib.use('TkAgg')  # Usar el backend TkAgg
     
     # Configurar para que las figuras se rendericen correctamente
-    plt.rcParams['figure.autolayout'] = True
-    plt.rcParams['figure.figsize'] = [10, 6]
-    plt.rcParams['figure.dpi'] = 100
-    plt.rcParams['font.size'] = 12
-    plt.rcParams['legend.fontsize'] = 10
-    plt.rcParams['figure.titlesize'] = 16
-    plt.rcParams['axes.labelsize'] = 14
-    plt.rcParams['axes.titlesize'] = 16
-    plt.rcParams['xtick.labelsize'] = 12
-    plt.rcParams['ytick.labelsize'] = 12
+    apply_matplotlib_style()
 
 if __name__ == "__main__":
     fix_matplotlib_for_tkinter()
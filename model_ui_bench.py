@@ -0,0 +1,274 @@
+# model_ui_bench.py
+"""
+Benchmark de latencia de la interfaz: guiones de interacción sobre WildfireAnalysisApp.
+
+Los benchmarks del backend no miden lo que nota el usuario (bloqueos del bucle de
+eventos de Tk, redibujado con seaborn, apertura de ventanas). Este script ejecuta
+la aplicación real sobre datasets sintéticos de tamaño creciente (escritos a CSV
+temporales) y, desde el propio hilo de Tk, repite:
+  - carga: desde crear la ventana hasta tener los datos y el primer año dibujado,
+  - año_siguiente / año_anterior: recorrer todos los años hacia adelante y atrás,
+  - pestaña: cambiar a cada pestaña con contenido pendiente,
+  - historico_apertura / historico_completo: show_historical_analysis hasta que abre
+    la ventana y hasta que dibuja la etapa final,
+  - riesgo_historico / resumen_historico: show_historical_risk_matrix y show_historical_summary.
+Las ventanas históricas se miden en frío (se vacía la caché del histórico antes de cada una).
+
+La latencia de una interacción va desde la llamada hasta que Tk procesa los
+eventos pendientes. El tiempo bloqueado del hilo principal se mide con un latido
+(after cada heartbeat_ms): cada retraso del latido mayor que su intervalo es
+tiempo en que la interfaz no respondía, y se asigna a la interacción en curso.
+
+Necesita un DISPLAY; si no hay, lanza un Xvfb propio (debe estar instalado).
+Uso:
+    python model_ui_bench.py --sizes 5000 50000 200000
+    python model_ui_bench.py --csv BD.csv --sizes
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+PERCENTILES = (50, 90, 99)
+
+
+def start_xvfb(display=':99', timeout=10):
+    """Lanza Xvfb si no hay DISPLAY; retorna el proceso (o None si ya había pantalla)."""
+    if os.environ.get('DISPLAY'):
+        return None
+    if shutil.which('Xvfb') is None:
+        raise RuntimeError("No hay DISPLAY y Xvfb no está instalado")
+    proc = subprocess.Popen(['Xvfb', display, '-screen', '0', '1280x1024x24', '-nolisten', 'tcp'],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    socket = f"/tmp/.X11-unix/X{display.lstrip(':')}"
+    deadline = time.perf_counter() + timeout
+    while not os.path.exists(socket):
+        if proc.poll() is not None or time.perf_counter() > deadline:
+            proc.kill()
+            raise RuntimeError(f"No se pudo iniciar Xvfb en {display}")
+        time.sleep(0.05)
+    os.environ['DISPLAY'] = display
+    return proc
+
+
+class Heartbeat:
+    """Latido en el bucle de Tk: el retraso de cada latido es tiempo con el hilo principal bloqueado."""
+
+    def __init__(self, root, interval_ms=10):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.interval = interval_ms / 1000
+        # (fin del bloqueo, duración) en segundos de perf_counter
+        self.stalls = []
+        self.last = time.perf_counter()
+        self._after = root.after(interval_ms, self._beat)
+
+    def _beat(self):
+        now = time.perf_counter()
+        lag = now - self.last - self.interval
+        if lag > self.interval:
+            self.stalls.append((now, lag))
+        self.last = now
+        self._after = self.root.after(self.interval_ms, self._beat)
+
+    def blocked(self, start, end):
+        """(tiempo bloqueado total, bloqueo más largo) de los retrasos que terminaron entre start y end."""
+        lags = [lag for stop, lag in self.stalls if start <= stop <= end]
+        return sum(lags), max(lags, default=0.0)
+
+    def stop(self):
+        self.root.after_cancel(self._after)
+
+
+class ErrorLog:
+    """Sustituto de messagebox: guarda los errores en lugar de abrir diálogos modales."""
+
+    def __init__(self):
+        self.errors = []
+
+    def showerror(self, title, message):
+        self.errors.append(message)
+
+    def showinfo(self, title, message):
+        pass
+
+    showwarning = showinfo
+
+
+class UIBenchmark:
+    """Ejecuta los guiones de interacción sobre una instancia de la aplicación."""
+
+    def __init__(self, root, app, heartbeat, dataset, errors):
+        self.root = root
+        self.app = app
+        self.heartbeat = heartbeat
+        self.dataset = dataset
+        self.errors = errors
+        self.records = []
+
+    def settle(self):
+        """Procesa los eventos pendientes (redibujos, latidos) sin esperar a nuevos."""
+        self.root.update()
+
+    def wait_until(self, condition, timeout=600):
+        """Atiende el bucle de Tk hasta que condition() sea cierto o la interfaz reporte un error."""
+        deadline = time.perf_counter() + timeout
+        while not condition() and not self.errors.errors:
+            if time.perf_counter() > deadline:
+                raise TimeoutError("La interfaz no terminó la interacción a tiempo")
+            self.settle()
+            time.sleep(0.002)
+
+    def record(self, interaction, start, end):
+        blocked, longest = self.heartbeat.blocked(start, end)
+        self.records.append({'dataset': self.dataset, 'interaccion': interaction,
+                             'latencia': end - start, 'bloqueado': blocked, 'bloqueo_max': longest})
+
+    def measure(self, interaction, action):
+        """Mide action() hasta que Tk termina de procesar los eventos que generó."""
+        start = time.perf_counter()
+        action()
+        self.settle()
+        self.record(interaction, start, time.perf_counter())
+
+    def close_toplevels(self):
+        import tkinter as tk
+        for widget in self.root.winfo_children():
+            if isinstance(widget, tk.Toplevel):
+                widget.destroy()
+        self.settle()
+
+    def navigate(self, rounds):
+        app = self.app
+        for _ in range(rounds):
+            while app.current_year.get() < app.max_year:
+                self.measure('año_siguiente', app.next_year)
+            while app.current_year.get() > app.min_year:
+                self.measure('año_anterior', app.previous_year)
+
+    def switch_tabs(self):
+        notebook = self.app.notebook
+        for tab in list(notebook.tabs())[1:] + [notebook.tabs()[0]]:
+            self.measure('pestaña', lambda tab=tab: notebook.select(tab))
+
+    def historical_windows(self, repeat):
+        app = self.app
+        for _ in range(repeat):
+            app.historical_cache.clear()
+            start = time.perf_counter()
+            window = app.show_historical_analysis()
+            self.settle()
+            self.record('historico_apertura', start, time.perf_counter())
+            # La etapa dibujada marca el final (la caché puede rechazar o desalojar el resultado)
+            if window is not None:
+                self.wait_until(lambda: window.get("stage") == "final")
+            self.settle()
+            self.record('historico_completo', start, time.perf_counter())
+            self.close_toplevels()
+
+            app.historical_cache.clear()
+            self.measure('riesgo_historico', app.show_historical_risk_matrix)
+            self.close_toplevels()
+            app.historical_cache.clear()
+            self.measure('resumen_historico', app.show_historical_summary)
+            self.close_toplevels()
+
+
+def run_dataset(dataset, csv_file, rounds=2, repeat=3, heartbeat_ms=10):
+    """Abre la aplicación sobre csv_file, ejecuta los guiones y retorna los registros por interacción."""
+    import tkinter as tk
+    import model_ui
+
+    model_ui.fix_matplotlib_for_tkinter()
+    errors = ErrorLog()
+    model_ui.messagebox = errors
+    root = tk.Tk()
+    heartbeat = Heartbeat(root, heartbeat_ms)
+    bench = UIBenchmark(root, None, heartbeat, dataset, errors)
+    try:
+        start = time.perf_counter()
+        app = model_ui.WildfireAnalysisApp(root, csv_file=csv_file)
+        bench.app = app
+        bench.settle()
+        bench.wait_until(lambda: app.rollup is not None)
+        bench.settle()
+        bench.record('carga', start, time.perf_counter())
+        if errors.errors:
+            raise RuntimeError(errors.errors[0])
+
+        bench.navigate(rounds)
+        bench.switch_tabs()
+        bench.historical_windows(repeat)
+        if errors.errors:
+            raise RuntimeError(f"La interfaz reportó {len(errors.errors)} errores: {errors.errors[0]}")
+    finally:
+        heartbeat.stop()
+        if bench.app is not None:
+            bench.app.on_close()
+        else:
+            root.destroy()
+    return bench.records
+
+
+def summarize(records):
+    """Percentiles de latencia y tiempo bloqueado por dataset e interacción (en milisegundos)."""
+    frame = pd.DataFrame(records)
+    rows = []
+    for (dataset, interaction), group in frame.groupby(['dataset', 'interaccion'], sort=False):
+        latency = group['latencia'].to_numpy() * 1000
+        row = {'dataset': dataset, 'interaccion': interaction, 'n': len(group)}
+        for p in PERCENTILES:
+            row[f'p{p}_ms'] = np.percentile(latency, p)
+        row['max_ms'] = latency.max()
+        row['bloqueado_ms'] = group['bloqueado'].sum() * 1000
+        row['bloqueado_pct'] = 100 * group['bloqueado'].sum() / group['latencia'].sum()
+        row['bloqueo_max_ms'] = group['bloqueo_max'].max() * 1000
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    from model_equivalence import make_synthetic_incidents
+
+    parser = argparse.ArgumentParser(description="Mide la latencia de la interfaz con interacciones guionizadas")
+    parser.add_argument('--sizes', type=int, nargs='*', default=[5000, 50000, 200000],
+                        help="Tamaños de los datasets sintéticos")
+    parser.add_argument('--csv', help="Dataset real adicional (por ejemplo BD.csv)")
+    parser.add_argument('--rounds', type=int, default=2, help="Recorridos completos de los años")
+    parser.add_argument('--repeat', type=int, default=3, help="Aperturas de cada ventana histórica")
+    parser.add_argument('--heartbeat-ms', type=int, default=10)
+    parser.add_argument('--output', help="CSV donde guardar el resumen")
+    args = parser.parse_args()
+
+    try:
+        xvfb = start_xvfb()
+    except RuntimeError as e:
+        sys.exit(str(e))
+    records = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            datasets = {}
+            for n in args.sizes:
+                path = os.path.join(tmp, f'sintetico_{n}.csv')
+                make_synthetic_incidents(n).drop(columns=['Latitud_round', 'Longitud_round']).to_csv(
+                    path, index=False, encoding='latin1')
+                datasets[f'sintetico_{n}'] = path
+            if args.csv:
+                datasets[args.csv] = args.csv
+            for name, path in datasets.items():
+                print(f"Midiendo {name}...", flush=True)
+                records.extend(run_dataset(name, path, args.rounds, args.repeat, args.heartbeat_ms))
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    report = summarize(records)
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.1f}"))
+    if args.output:
+        report.to_csv(args.output, index=False)